@@ -1,6 +1,7 @@
 from hygroup.agent.base import (
     Agent,
     AgentRegistry,
+    AgentRegistryChange,
     AgentRequest,
     AgentResponse,
     FeedbackRequest,
@@ -14,5 +15,9 @@ from hygroup.agent.select import (
     AgentSelectionConfirmationResponse,
     AgentSelectionResult,
     AgentSelector,
+    AgentSelectorEngine,
     AgentSelectorSettings,
+    PreSelectionStats,
+    PreSelector,
+    RulePreSelector,
 )
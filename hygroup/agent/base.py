@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
-from asyncio import Future
+from asyncio import Future, Queue
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from typing import Any, AsyncIterator, Sequence
+from typing import Any, AsyncIterator, Iterable, Sequence
 
 
 @dataclass
@@ -97,7 +97,7 @@ class Agent(ABC):
         yield
 
     @asynccontextmanager
-    async def request_scope(self, secrets: dict[str, str] | None = None):
+    async def request_scope(self, secrets: dict[str, str] | None = None, username: str | None = None):
         yield
 
     @abstractmethod
@@ -115,7 +115,63 @@ class Agent(ABC):
     def set_state(self, state: Any): ...
 
 
+@dataclass
+class AgentRegistryChange:
+    version: int
+    """Registry version after this change."""
+
+    added: set[str] = field(default_factory=set)
+    """Names of agents that have been registered."""
+
+    updated: set[str] = field(default_factory=set)
+    """Names of agents whose configuration has been updated."""
+
+    removed: set[str] = field(default_factory=set)
+    """Names of agents that have been removed."""
+
+
 class AgentRegistry(ABC):
+    def __init__(self):
+        self._version = 0
+        self._agent_versions: dict[str, int] = {}
+        self._subscribers: set[Queue[AgentRegistryChange]] = set()
+
+    @property
+    def version(self) -> int:
+        """Incremented on every change of registered agents."""
+        return self._version
+
+    def agent_version(self, name: str) -> int:
+        """Registry version of the last change of the agent registered under `name`."""
+        return self._agent_versions.get(name, 0)
+
+    def subscribe(self, maxsize: int = 100) -> Queue[AgentRegistryChange]:
+        """Subscribe to changes of registered agents.
+
+        Returns a queue that receives changes after this call. Sessions and
+        selectors don't subscribe, they compare `version` and `agent_version`
+        instead. The change feed is meant for external consumers and tests,
+        which must `unsubscribe` when done. If the queue is full, its oldest
+        change is dropped; consumers detect dropped changes by a gap in
+        change versions.
+        """
+        queue: Queue[AgentRegistryChange] = Queue(maxsize=maxsize)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: Queue[AgentRegistryChange]):
+        self._subscribers.discard(queue)
+
+    def _notify(self, added: Iterable[str] = (), updated: Iterable[str] = (), removed: Iterable[str] = ()):
+        self._version += 1
+        change = AgentRegistryChange(self._version, set(added), set(updated), set(removed))
+        for name in change.added | change.updated | change.removed:
+            self._agent_versions[name] = self._version
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(change)
+
     @abstractmethod
     async def create_agent(self, name: str) -> Agent: ...
 
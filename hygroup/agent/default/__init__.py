@@ -1,3 +1,3 @@
 from hygroup.agent.default.agent import AgentSettings, DefaultAgent, HandoffAgent, MCPSettings
 from hygroup.agent.default.prompt import InputFormatter
-from hygroup.agent.default.registry import DefaultAgentRegistry
+from hygroup.agent.default.registry import AgentTemplate, DefaultAgentRegistry
@@ -3,17 +3,17 @@ import importlib
 import inspect
 import os
 from abc import abstractmethod
-from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from contextvars import ContextVar
 from dataclasses import asdict, dataclass, field
 from functools import wraps
 from pathlib import Path
-from typing import Any, AsyncIterator, Callable, Generic, Iterator, Optional, Sequence, Type, TypeVar
+from typing import Any, AsyncIterator, Callable, Generic, Optional, Sequence, Type, TypeVar
 
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent as AgentImpl
-from pydantic_ai.mcp import MCPServer, MCPServerStdio, MCPServerStreamableHTTP
 from pydantic_ai.messages import ModelMessagesTypeAdapter
+from pydantic_ai.models import Model
 from pydantic_ai.settings import ModelSettings
 from pydantic_core import to_jsonable_python
 
@@ -25,25 +25,13 @@ from hygroup.agent.base import (
     Message,
     PermissionRequest,
 )
+from hygroup.agent.default.mcp import MCPSettings, ScopedMCPServer, default_pools
 from hygroup.agent.default.prompt import InputFormatter, format_input
-from hygroup.agent.default.utils import resolve_config_variables
 from hygroup.agent.utils import model_from_dict
 
 D = TypeVar("D")
 
 
-@dataclass
-class MCPSettings:
-    server_config: dict[str, Any]
-    session_scope: bool = True
-
-    def server(self) -> MCPServer:
-        if "command" in self.server_config:
-            return MCPServerStdio(**self.server_config)
-        else:
-            return MCPServerStreamableHTTP(**self.server_config)
-
-
 @dataclass
 class AgentSettings:
     model: str | dict
@@ -122,15 +110,15 @@ class AgentBase(Generic[D], Agent):
         settings: AgentSettings,
         input_formatter: InputFormatter,
         output_type: Type[D],
+        model: Model | str | None = None,
     ):
         super().__init__(name)
         self.settings = settings
         self.input_formatter = input_formatter
 
-        if isinstance(settings.model, dict):
-            model = model_from_dict(settings.model)
-        else:
-            model = settings.model
+        if model is None:
+            # model instance shared with other agents is created from settings.model otherwise
+            model = model_from_dict(settings.model) if isinstance(settings.model, dict) else settings.model
 
         # delegate agent
         self.agent: AgentImpl[None, D] = AgentImpl(
@@ -145,8 +133,8 @@ class AgentBase(Generic[D], Agent):
         self._ctx_secrets = ContextVar[bool]("secrets")
 
         # references servers with patched call_tool methods
-        self._session_mcp_servers: list[MCPServer] = []
-        self._request_mcp_servers: list[MCPServer] = []
+        self._session_mcp_servers: list[ScopedMCPServer] = []
+        self._request_mcp_servers: list[ScopedMCPServer] = []
         self.agent._mcp_servers = []
 
         for mcp_settings in settings.mcp_settings:
@@ -168,16 +156,31 @@ class AgentBase(Generic[D], Agent):
 
     @asynccontextmanager
     async def session_scope(self):
-        with self._configure_mcp_servers(self._session_mcp_servers, dict(os.environ)) as servers:
-            async with self._run_mcp_servers(servers):
-                yield
+        # session-scoped servers are shared with other sessions
+        # of agents that resolve to the same server settings
+        async with AsyncExitStack() as exit_stack:
+            pool = default_pools().session
+            for server in self._session_mcp_servers:
+                await exit_stack.enter_async_context(server.lease(pool, dict(os.environ)))
+            yield
 
     @asynccontextmanager
-    async def request_scope(self, secrets: dict[str, str] | None = None):
-        self._ctx_secrets.set(secrets is not None)
-        with self._configure_mcp_servers(self._request_mcp_servers, dict(os.environ) | (secrets or {})) as servers:
-            async with self._run_mcp_servers(servers):
+    async def request_scope(self, secrets: dict[str, str] | None = None, username: str | None = None):
+        # secrets and leased servers are bound to the current context, so
+        # that concurrent requests of different users don't see each other's
+        token = self._ctx_secrets.set(secrets is not None)
+        try:
+            # request-scoped servers are kept warm for later requests of the
+            # same user with the same resolved config, never for other users
+            async with AsyncExitStack() as exit_stack:
+                pool = default_pools().request
+                owner = username or ""
+                config_values = dict(os.environ) | (secrets or {})
+                for server in self._request_mcp_servers:
+                    await exit_stack.enter_async_context(server.lease(pool, config_values, owner))
                 yield
+        finally:
+            self._ctx_secrets.reset(token)
 
     async def run(
         self,
@@ -189,20 +192,24 @@ class AgentBase(Generic[D], Agent):
         self._ctx_queue.set(queue)
 
         task = asyncio.create_task(self._run(request=request, updates=updates, stream=stream))
+        # wakes up the consumer when the run ends, also if it fails
+        task.add_done_callback(lambda _: queue.put_nowait(task))
 
-        while True:
-            if task.done() and task.exception():
-                raise task.exception()  # type: ignore
-            try:
-                obj = queue.get_nowait()
-            except asyncio.QueueEmpty:
-                await asyncio.sleep(0.1)
-                continue
-            else:
+        try:
+            while True:
+                obj = await queue.get()
+                if obj is task:
+                    # re-raises the exception of a failed run
+                    task.result()
+                    break
                 yield obj
                 match obj:
                     case AgentResponse(final=True):
                         break
+        finally:
+            # consumer stopped before the run completed
+            if not task.done():
+                task.cancel()
 
     async def _run(self, request: AgentRequest, updates: Sequence[Message], stream: bool):
         queue = self._ctx_queue.get()
@@ -226,46 +233,6 @@ class AgentBase(Generic[D], Agent):
         await queue.put(AgentResponse(text=self._text(data), final=True, handoffs=self._handoffs(data)))
         self._history.extend(result.new_messages())
 
-    @staticmethod
-    @asynccontextmanager
-    async def _run_mcp_servers(mcp_servers: list[MCPServer]):
-        exit_stack = AsyncExitStack()
-        try:
-            for mcp_server in mcp_servers:
-                await exit_stack.enter_async_context(mcp_server)
-            yield
-        finally:
-            await exit_stack.aclose()
-
-    @staticmethod
-    @contextmanager
-    def _configure_mcp_servers(
-        mcp_servers: list[MCPServer], config_values: dict[str, str]
-    ) -> Iterator[list[MCPServer]]:
-        backups = []
-
-        try:
-            for server in mcp_servers:
-                match server:
-                    case MCPServerStdio() if server.env is not None:
-                        new_env, updated = resolve_config_variables(server.env, config_values)
-                        if updated:
-                            backups.append((server, "env", dict(server.env)))
-                            server.env = new_env
-                    case MCPServerStreamableHTTP() if server.headers is not None:
-                        new_headers, updated = resolve_config_variables(server.headers, config_values)
-                        if updated:
-                            backups.append((server, "headers", dict(server.headers)))
-                            server.headers = new_headers
-                    case _:
-                        pass
-
-            yield mcp_servers
-
-        finally:
-            for server, field_name, original_value in reversed(backups):
-                setattr(server, field_name, original_value)
-
     @abstractmethod
     def _text(self, data: D) -> str: ...
 
@@ -301,7 +268,7 @@ class AgentBase(Generic[D], Agent):
         """Register an MCP server with the agent."""
 
         def decorator(settings: MCPSettings):
-            server = settings.server()
+            server = ScopedMCPServer(settings)
 
             # keep a reference to the non-patched call_tool method
             call_tool = server.call_tool
@@ -355,12 +322,14 @@ class HandoffAgent(AgentBase[Handoff]):
         name: str,
         settings: AgentSettings,
         input_formatter: InputFormatter = format_input,
+        model: Model | str | None = None,
     ):
         super().__init__(
             name=name,
             settings=settings,
             input_formatter=input_formatter,
             output_type=Handoff,
+            model=model,
         )
 
     def _text(self, data: Handoff) -> str:
@@ -376,12 +345,14 @@ class DefaultAgent(AgentBase[str]):
         name: str,
         settings: AgentSettings,
         input_formatter: InputFormatter = format_input,
+        model: Model | str | None = None,
     ):
         super().__init__(
             output_type=str,
             name=name,
             settings=settings,
             input_formatter=input_formatter,
+            model=model,
         )
 
     def _text(self, data: str) -> str:
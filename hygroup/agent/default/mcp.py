@@ -0,0 +1,330 @@
+import asyncio
+import hashlib
+import json
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, AsyncIterator
+
+from pydantic_ai.exceptions import UserError
+from pydantic_ai.mcp import MCPServer, MCPServerStdio, MCPServerStreamableHTTP, ToolResult
+from pydantic_ai.tools import ToolDefinition
+
+from hygroup.agent.default.utils import resolve_config_variables
+
+
+@dataclass
+class MCPSettings:
+    server_config: dict[str, Any]
+    session_scope: bool = True
+    concurrent_calls: bool = True
+
+    def server(self) -> MCPServer:
+        if "command" in self.server_config:
+            return MCPServerStdio(**self.server_config)
+        else:
+            return MCPServerStreamableHTTP(**self.server_config)
+
+    def resolve(self, config_values: dict[str, str]) -> "MCPSettings":
+        """Return a copy of these settings with `${VAR}` placeholders in `env`
+        or `headers` substituted by `config_values`.
+        """
+        server_config = dict(self.server_config)
+        for key in ("env", "headers"):
+            if server_config.get(key) is not None:
+                values, updated = resolve_config_variables(server_config[key], config_values)
+                if updated:
+                    server_config[key] = values
+        return replace(self, server_config=server_config)
+
+    def fingerprint(self, owner: str = "") -> str:
+        """Hash of these settings, including resolved secrets, and `owner`."""
+        data = json.dumps([asdict(self), owner], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+
+@dataclass
+class MCPPoolStats:
+    starts: int = 0
+    """Number of started servers."""
+
+    reuses: int = 0
+    """Number of leases served by an already running server."""
+
+    reclaims: int = 0
+    """Number of idle servers that have been stopped after `idle_timeout`."""
+
+    evictions: int = 0
+    """Number of idle servers that have been stopped to stay within `max_size`."""
+
+    overflows: int = 0
+    """Number of leases served by an unpooled server because the pool was full."""
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    """Number of tool listings served from the cache."""
+
+    misses: int = 0
+    """Number of tool listings requested from the server."""
+
+
+class PooledMCPServer:
+    """A running MCP server, shared by all leases of the same resolved settings.
+
+    The server is entered and exited by a dedicated task, so that it can be
+    stopped independently of the tasks that leased it. Tool calls are sent
+    concurrently unless `concurrent_calls` is disabled in the settings.
+
+    Tool listings are cached for `tools_ttl` seconds, so tools added or
+    removed by the server are seen after at most `tools_ttl` seconds.
+    """
+
+    def __init__(self, settings: MCPSettings, tools_ttl: float = 60.0):
+        self.settings = settings
+        self.server = settings.server()
+        self.leases = 0
+
+        self.tools_ttl = tools_ttl
+        self.tool_stats = ToolCacheStats()
+        self._tools: list[ToolDefinition] | None = None
+        self._tools_expiry = 0.0
+
+        self._call_lock = None if settings.concurrent_calls else asyncio.Lock()
+        self._started = asyncio.get_running_loop().create_future()
+        self._stopped = asyncio.Event()
+        self._task = asyncio.create_task(self._serve())
+        self._reclaim: asyncio.TimerHandle | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.server.is_running
+
+    async def started(self):
+        """Wait for the server to complete the MCP handshake."""
+        await asyncio.shield(self._started)
+
+    async def stop(self):
+        self._stopped.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def list_tools(self) -> list[ToolDefinition]:
+        if self._tools is not None and time.monotonic() < self._tools_expiry:
+            self.tool_stats.hits += 1
+            return list(self._tools)
+
+        self.tool_stats.misses += 1
+        tools = await self.server.list_tools()
+
+        self._tools = tools
+        self._tools_expiry = time.monotonic() + self.tools_ttl
+        return list(tools)
+
+    async def call_tool(
+        self, tool_name: str, arguments: dict[str, Any], metadata: dict[str, Any] | None = None
+    ) -> ToolResult:
+        if self._call_lock is None:
+            return await self.server.call_tool(tool_name, arguments, metadata)
+        async with self._call_lock:
+            return await self.server.call_tool(tool_name, arguments, metadata)
+
+    async def _serve(self):
+        try:
+            async with self.server:
+                self._started.set_result(None)
+                await self._stopped.wait()
+        except Exception as e:
+            if self._started.done():
+                raise
+            self._started.set_exception(e)
+        finally:
+            if not self._started.done():
+                self._started.cancel()
+
+
+class MCPServerPool:
+    """Pool of running MCP servers, keyed by resolved settings and owner.
+
+    Leases of the same resolved settings and owner share a single server.
+    A server is stopped once it has not been leased for `idle_timeout`
+    seconds. If the pool holds `max_size` servers, the least recently
+    leased idle server is evicted to make room for a new one. If none of
+    them is idle, the new server is started outside the pool and stopped
+    when its lease ends.
+
+    Servers cache their tool listings for at most `tools_ttl` seconds.
+    """
+
+    def __init__(self, idle_timeout: float = 300.0, max_size: int | None = None, tools_ttl: float = 60.0):
+        self.idle_timeout = idle_timeout
+        self.max_size = max_size
+        self.tools_ttl = tools_ttl
+        self._servers: OrderedDict[str, PooledMCPServer] = OrderedDict()
+        self._stopping: set[asyncio.Task] = set()
+        self._stats = MCPPoolStats()
+
+    @property
+    def stats(self) -> MCPPoolStats:
+        return self._stats
+
+    def __len__(self) -> int:
+        return len(self._servers)
+
+    @asynccontextmanager
+    async def lease(self, settings: MCPSettings, owner: str = "") -> AsyncIterator[PooledMCPServer]:
+        """Lease a running server for resolved `settings`, starting it if needed.
+
+        Servers are only shared between leases of the same `owner`.
+        """
+        key = settings.fingerprint(owner)
+        server = self._servers.get(key)
+
+        if server is None:
+            server = PooledMCPServer(settings, tools_ttl=self.tools_ttl)
+            self._stats.starts += 1
+            if self._make_room():
+                self._servers[key] = server
+            else:
+                self._stats.overflows += 1
+                async with self._unpooled(server):
+                    yield server
+                return
+        else:
+            self._servers.move_to_end(key)
+            self._stats.reuses += 1
+
+        if server._reclaim is not None:
+            server._reclaim.cancel()
+            server._reclaim = None
+
+        server.leases += 1
+        try:
+            await server.started()
+            yield server
+        finally:
+            server.leases -= 1
+            if server.leases == 0:
+                # servers that failed to start are removed right away
+                delay = self.idle_timeout if server.is_running else 0
+                server._reclaim = asyncio.get_running_loop().call_later(delay, self._reclaim_idle, key, server)
+
+    @asynccontextmanager
+    async def _unpooled(self, server: PooledMCPServer) -> AsyncIterator[None]:
+        server.leases += 1
+        try:
+            await server.started()
+            yield
+        finally:
+            server.leases -= 1
+            await server.stop()
+
+    def _make_room(self) -> bool:
+        if self.max_size is None or len(self._servers) < self.max_size:
+            return True
+        for key, server in self._servers.items():
+            if server.leases == 0:
+                self._stats.evictions += 1
+                self._remove(key, server)
+                return True
+        return False
+
+    async def close(self):
+        """Stop all servers, including leased ones."""
+        for key, server in list(self._servers.items()):
+            self._remove(key, server)
+        await asyncio.gather(*self._stopping)
+
+    def _reclaim_idle(self, key: str, server: PooledMCPServer):
+        if server.leases == 0 and self._servers.get(key) is server:
+            self._stats.reclaims += 1
+            self._remove(key, server)
+
+    def _remove(self, key: str, server: PooledMCPServer):
+        del self._servers[key]
+        if server._reclaim is not None:
+            server._reclaim.cancel()
+        task = asyncio.create_task(server.stop())
+        task.add_done_callback(self._stopping.discard)
+        self._stopping.add(task)
+
+
+@dataclass
+class MCPServerPools:
+    session: MCPServerPool = field(default_factory=MCPServerPool)
+    """Servers of session-scoped MCP settings, shared across sessions."""
+
+    request: MCPServerPool = field(default_factory=lambda: MCPServerPool(idle_timeout=120.0, max_size=32))
+    """Servers of request-scoped MCP settings, kept warm per user."""
+
+    async def close(self):
+        await asyncio.gather(self.session.close(), self.request.close())
+
+
+_pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPServerPools] = weakref.WeakKeyDictionary()
+
+
+def default_pools() -> MCPServerPools:
+    """Process-wide MCP server pools (one per event loop)."""
+    loop = asyncio.get_running_loop()
+    if (pools := _pools.get(loop)) is None:
+        pools = _pools[loop] = MCPServerPools()
+    return pools
+
+
+class ScopedMCPServer(MCPServer):
+    """MCP server registered with the delegate agent.
+
+    Tool listings and calls are forwarded to the server leased for the
+    current session or request scope. Leases are tracked per context, so
+    concurrent scopes of the same agent use their own leased servers.
+    Entering this server directly opens a dedicated connection with the
+    settings of the leased server.
+    """
+
+    def __init__(self, settings: MCPSettings):
+        super().__init__()
+        self.settings = settings
+        self._leased = ContextVar[PooledMCPServer | None](f"mcp_server_{id(self)}", default=None)
+
+    @property
+    def leased(self) -> PooledMCPServer | None:
+        """The server leased for the current scope."""
+        return self._leased.get()
+
+    @property
+    def is_running(self) -> bool:
+        leased = self._leased.get()
+        return leased is not None and leased.is_running
+
+    @asynccontextmanager
+    async def lease(
+        self, pool: MCPServerPool, config_values: dict[str, str], owner: str = ""
+    ) -> AsyncIterator[PooledMCPServer]:
+        async with pool.lease(self.settings.resolve(config_values), owner) as leased:
+            token = self._leased.set(leased)
+            try:
+                yield leased
+            finally:
+                self._leased.reset(token)
+
+    async def list_tools(self) -> list[ToolDefinition]:
+        return await self._server().list_tools()
+
+    async def call_tool(
+        self, tool_name: str, arguments: dict[str, Any], metadata: dict[str, Any] | None = None
+    ) -> ToolResult:
+        return await self._server().call_tool(tool_name, arguments, metadata)
+
+    @asynccontextmanager
+    async def client_streams(self):
+        async with self._server().server.client_streams() as streams:
+            yield streams
+
+    def _server(self) -> PooledMCPServer:
+        if (leased := self._leased.get()) is None:
+            raise UserError(f"MCP server is not running: {self.settings.server_config}")
+        return leased
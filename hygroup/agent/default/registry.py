@@ -1,59 +1,117 @@
 import asyncio
+import copy
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from pydantic_ai.models import Model
 from tinydb import Query, TinyDB
 
 from hygroup.agent.base import AgentRegistry
 from hygroup.agent.default.agent import AgentBase, AgentFactory, AgentSettings, DefaultAgent, HandoffAgent
+from hygroup.agent.utils import model_from_dict
 from hygroup.utils import arun
 
 
+@dataclass
+class AgentTemplate:
+    """Agent config with its tools imported and its model created.
+
+    Agents created from a template share the template's settings
+    and model, only their history and MCP server leases are their own.
+    """
+
+    settings: AgentSettings
+    model: Model | str
+    handoff: bool
+
+    @staticmethod
+    def from_config(doc: dict[str, Any]) -> "AgentTemplate":
+        settings = AgentSettings.from_dict(doc["settings"])
+
+        model: Model | str
+        if isinstance(settings.model, dict):
+            model = model_from_dict(settings.model)
+        else:
+            model = settings.model
+
+        return AgentTemplate(settings=settings, model=model, handoff=doc["handoff"])
+
+    def create_agent(self, name: str) -> AgentBase:
+        if self.handoff:
+            return HandoffAgent(name=name, settings=self.settings, model=self.model)
+        else:
+            return DefaultAgent(name=name, settings=self.settings, model=self.model)
+
+
 class DefaultAgentRegistry(AgentRegistry):
     """Registry for agent configurations and agent factories.
 
     Agent configurations are persisted in `registry_path`, agent factories are kept in memory.
+    Configurations are read from `registry_path` once and then served from an in-memory index
+    that is updated by `add_config`, `update_config` and `remove_config`. If `revalidate` is
+    `True`, each lookup stats `registry_path` and reloads the index when the file has been
+    modified by another process. Modifications by another process count as a registry change
+    and are published to subscribers when the index is reloaded.
+
+    Agents are created from an `AgentTemplate` that is compiled once per config version.
 
     **THIS IS A REFERENCE IMPLEMENTATION FOR EXPERIMENTATION, DO NOT USE IN PRODUCTION.**
     """
 
-    def __init__(self, registry_path: Path | str = Path(".data", "agents", "registry.json")):
+    def __init__(self, registry_path: Path | str = Path(".data", "agents", "registry.json"), revalidate: bool = False):
+        super().__init__()
         self.registry_path = Path(registry_path)
         self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        self.revalidate = revalidate
 
         self._factories: dict[str, dict[str, Any]] = {}
         self._tinydb = TinyDB(str(self.registry_path), indent=2)
         self._lock = asyncio.Lock()
 
+        # agent configs by name, with the (mtime, size)
+        # of registry_path when they were loaded
+        self._configs: dict[str, dict[str, Any]] | None = None
+        self._loaded_stat: tuple[int, int] | None = None
+
+        # compiled agent configs by name, with their config version
+        self._templates: dict[str, tuple[int, AgentTemplate]] = {}
+
+    @property
+    def version(self) -> int:
+        # a modification by another process is already counted
+        # here, the index is reloaded on the next lookup
+        return self._version + 1 if self._modified() else self._version
+
     async def create_agent(self, name: str) -> AgentBase:
         """Create an agent from config or factory registered under `name`."""
         if doc := self._factories.get(name):
             return doc["factory"]()
 
-        doc = await self.get_config(name)
+        doc = (await self._index()).get(name)
 
         if doc is None:
             raise ValueError(f"No agent registered with name '{name}'")
 
-        settings = AgentSettings.from_dict(doc["settings"])
+        version = self.agent_version(name)
+        cached = self._templates.get(name)
 
-        if doc["handoff"]:
-            return HandoffAgent(name=name, settings=settings)
-        else:
-            return DefaultAgent(name=name, settings=settings)
+        if cached is None or cached[0] != version:
+            cached = self._templates[name] = version, AgentTemplate.from_config(doc)
+
+        return cached[1].create_agent(name)
 
     async def get_registered_names(self) -> set[str]:
         """Get the names of all registered agent configs and factories."""
-        descriptions = await self.get_descriptions()
-        return set(descriptions.keys())
+        configs = await self._index()
+        return configs.keys() | self._factories.keys()
 
     async def get_descriptions(self) -> dict[str, str]:
         """Return a dictionary of agent names and their descriptions."""
         descriptions = {}
 
-        async with self._lock:
-            for doc in await arun(self._tinydb.all):
-                descriptions[doc["name"]] = doc["description"]
+        for doc in (await self._index()).values():
+            descriptions[doc["name"]] = doc["description"]
 
         for name, doc in self._factories.items():
             descriptions[name] = doc["description"]
@@ -64,20 +122,52 @@ class DefaultAgentRegistry(AgentRegistry):
         if factory_doc := self._factories.get(name):
             return factory_doc.get("emoji")
 
-        if config_doc := await self.get_config(name):
+        if config_doc := (await self._index()).get(name):
             return config_doc.get("emoji")
 
         return None
 
     async def get_config(self, name: str) -> dict[str, Any] | None:
-        """Get the agent configuration registered under `name`."""
-        configs = await self.get_configs()
-        return configs.get(name)
+        """Get a copy of the agent configuration registered under `name`."""
+        configs = await self._index()
+        return copy.deepcopy(configs.get(name))
 
     async def get_configs(self) -> dict[str, dict[str, Any]]:
-        """Get the configurations for all agents."""
+        """Get copies of the configurations for all agents."""
+        return copy.deepcopy(await self._index())
+
+    async def _index(self) -> dict[str, dict[str, Any]]:
+        if self._configs is not None and not self._modified():
+            return self._configs
+
         async with self._lock:
-            return {agent["name"]: agent for agent in await arun(self._tinydb.all)}
+            return await self._load()
+
+    async def _load(self) -> dict[str, dict[str, Any]]:
+        # must be called with self._lock held
+        if self._configs is None or self._modified():
+            loaded = self._configs
+            self._loaded_stat = self._file_version()
+            self._configs = {doc["name"]: dict(doc) for doc in await arun(self._tinydb.all)}
+            if loaded is not None:
+                self._notify(
+                    added=self._configs.keys() - loaded.keys(),
+                    updated={
+                        name for name in self._configs.keys() & loaded.keys() if self._configs[name] != loaded[name]
+                    },
+                    removed=loaded.keys() - self._configs.keys(),
+                )
+        return self._configs
+
+    def _modified(self) -> bool:
+        return self.revalidate and self._configs is not None and self._file_version() != self._loaded_stat
+
+    def _file_version(self) -> tuple[int, int] | None:
+        try:
+            stat = self.registry_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
     async def add_config(
         self,
@@ -88,12 +178,11 @@ class DefaultAgentRegistry(AgentRegistry):
         emoji: str | None = None,
     ):
         """Register an agent configuration."""
-        Agent = Query()
-
         async with self._lock:
+            configs = await self._load()
+
             # Check if name already exists
-            existing = await arun(self._tinydb.get, Agent.name == name)
-            if existing is not None:
+            if name in configs:
                 raise ValueError(f"Agent with name '{name}' already exists")
 
             # Convert AgentSettings to dict for storage
@@ -110,6 +199,9 @@ class DefaultAgentRegistry(AgentRegistry):
 
             # Insert document
             await arun(self._tinydb.insert, doc)
+            configs[name] = doc
+            self._loaded_stat = self._file_version()
+            self._notify(added=[name])
 
     async def update_config(
         self,
@@ -123,7 +215,9 @@ class DefaultAgentRegistry(AgentRegistry):
         Agent = Query()
 
         async with self._lock:
-            existing = await arun(self._tinydb.get, Agent.name == name)
+            configs = await self._load()
+
+            existing = configs.get(name)
             if existing is None:
                 raise ValueError(f"No agent registered with name '{name}'")
 
@@ -139,26 +233,46 @@ class DefaultAgentRegistry(AgentRegistry):
 
             if update_doc:
                 await arun(self._tinydb.update, update_doc, Agent.name == name)
+                configs[name] = existing | update_doc
+                self._loaded_stat = self._file_version()
+                self._notify(updated=[name])
 
     async def remove_config(self, name: str):
         """Remove an agent configuration."""
         Agent = Query()
 
         async with self._lock:
+            configs = await self._load()
             removed_ids = await arun(self._tinydb.remove, Agent.name == name)
+            configs.pop(name, None)
+            self._templates.pop(name, None)
+            self._loaded_stat = self._file_version()
 
         if not removed_ids:
             raise ValueError(f"No agent registered with name '{name}'")
 
+        self._notify(removed=[name])
+
     async def remove_configs(self):
         async with self._lock:
+            configs = await self._load()
             await arun(self._tinydb.drop_tables)
+            self._configs = {}
+            self._templates.clear()
+            self._loaded_stat = self._file_version()
+            if configs:
+                self._notify(removed=configs.keys())
 
     def add_factory(self, name: str, description: str, factory: AgentFactory, emoji: str | None = None):
+        change = "updated" if name in self._factories else "added"
         self._factories[name] = {"name": name, "description": description, "factory": factory, "emoji": emoji}
+        self._notify(**{change: [name]})
 
     def remove_factory(self, name: str):
         self._factories.pop(name)
+        self._notify(removed=[name])
 
     def remove_factories(self):
-        self._factories.clear()
+        if names := set(self._factories):
+            self._factories.clear()
+            self._notify(removed=names)
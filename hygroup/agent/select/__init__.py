@@ -4,5 +4,8 @@ from hygroup.agent.select.agent import (
     AgentSelectionConfirmationResponse,
     AgentSelectionResult,
     AgentSelector,
+    AgentSelectorEngine,
     AgentSelectorSettings,
 )
+from hygroup.agent.select.prefilter import PreSelectionStats, PreSelector, RulePreSelector
+from hygroup.agent.select.router import Router, SelectionDecision, SelectionLog, train_router
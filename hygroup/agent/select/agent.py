@@ -1,11 +1,14 @@
 from asyncio import Future
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Literal
 
 import aiofiles
 from pydantic import BaseModel
 from pydantic_ai import Agent
+from pydantic_ai.agent import AgentRunResult
 from pydantic_ai.messages import (
+    ModelMessage,
     ModelMessagesTypeAdapter,
     ModelRequest,
     ModelResponse,
@@ -20,9 +23,13 @@ from pydantic_core import to_jsonable_python
 
 from hygroup.agent.base import AgentRegistry, Message
 from hygroup.agent.default.prompt import format_message
+from hygroup.agent.select.prefilter import PreSelector
 from hygroup.agent.select.prompt import INSTRUCTIONS
+from hygroup.agent.select.router import Router, SelectionDecision, SelectionLog
 from hygroup.agent.utils import model_from_dict
 
+SUMMARY_PREFIX = "Summary of earlier messages:\n"
+
 
 class AgentSelection(BaseModel):
     agent_name: str | None = None
@@ -74,8 +81,57 @@ class AgentSelectorSettings:
         )
     )
 
+    pre_selector: PreSelector | None = None
+    """
+    Rules out an agent for obvious non-requests without running the model,
+    e.g. a `RulePreSelector`. Shared by all selectors created with these
+    settings. Disabled if `None`.
+    """
+
+    router: Router | None = None
+    """
+    Local routing model, consulted before running the selector model.
+    """
+
+    router_threshold: float = 0.9
+    """
+    Minimum confidence of a router prediction. The selector model is
+    run for predictions with lower confidence.
+    """
+
+    decisions_file: Path | str | None = None
+    """
+    If set, confirmed and rejected selections are logged to this file
+    for training a router.
+    """
+
+    history_turns: int | None = 50
+    """
+    Maximum number of messages (turns) in the selector history. When
+    exceeded, the older half is collapsed into a summary. `None` keeps
+    the complete history.
+    """
+
+    summary_size: int = 2000
+    """
+    Maximum number of characters of the summary of collapsed turns.
+    """
+
+    backlog_policy: Literal["all", "latest"] = "all"
+    """
+    Handling of messages queued while the selector is busy. With `all`,
+    an agent is selected for each queued message. With `latest`, an
+    agent is only selected for the latest message that is not skipped
+    by the pre-selector, earlier messages are added to the selector's
+    history.
+    """
+
+
+class AgentSelectorEngine:
+    """Stateless part of agent selection: model, tools, instructions and
+    routing. A single engine is shared by the selectors of all sessions.
+    """
 
-class AgentSelector:
     def __init__(
         self,
         registry: AgentRegistry,
@@ -96,8 +152,100 @@ class AgentSelector:
             output_type=AgentSelection,
         )
         self._agent.tool_plain(registry.get_registered_agents)
+
+        # instructions read from instructions_file, with
+        # the file's (mtime, size) when they were read
+        self._instructions: tuple[tuple[int, int], str] | None = None
+
+    async def instructions(self) -> str:
+        if not self.settings.instructions_file:
+            return self.settings.instructions
+
+        try:
+            stat = Path(self.settings.instructions_file).stat()
+        except FileNotFoundError:
+            return self.settings.instructions
+
+        version = (stat.st_mtime_ns, stat.st_size)
+        if self._instructions is None or self._instructions[0] != version:
+            async with aiofiles.open(self.settings.instructions_file, "r") as f:
+                self._instructions = version, await f.read()
+        return self._instructions[1]
+
+    def invalidate_instructions(self):
+        """Reload the instructions from `instructions_file` on the next selection."""
+        self._instructions = None
+
+    def skip(self, message: Message) -> bool:
+        """Whether the pre-selector rules out an agent for `message`."""
+        pre_selector = self.settings.pre_selector
+        return pre_selector is not None and pre_selector.skip(message)
+
+    def route(self, message: Message) -> tuple[AgentSelection, float] | None:
+        """Selection of the router and its confidence, `None` if the
+        confidence is below the threshold or no router is configured.
+        """
+        router = self.settings.router
+        if router is None:
+            return None
+
+        agent_name, confidence = router.predict(message.text)
+        if confidence < self.settings.router_threshold:
+            return None
+
+        # the agent has access to the conversation
+        # history, so the message text is the query
+        selection = AgentSelection(agent_name=agent_name, query=message.text if agent_name else None)
+        return selection, confidence
+
+    async def run(self, message: Message, history: list[ModelMessage]) -> AgentRunResult[AgentSelection]:
+        return await self._agent.run(
+            user_prompt=format_message(message),
+            message_history=history,
+        )
+
+    async def record(
+        self,
+        message: Message,
+        selection: AgentSelection,
+        response: AgentSelectionConfirmationResponse,
+    ):
+        """Log a confirmed or rejected selection for training a router."""
+        if self.settings.decisions_file is None:
+            return
+
+        decision = SelectionDecision(
+            text=message.text,
+            agent_name=selection.agent_name,
+            confirmed=response.confirmed,
+            comment=response.comment,
+        )
+        await SelectionLog(self.settings.decisions_file).append(decision)
+
+
+class AgentSelector:
+    """Agent selection history of a session, selections are made by a shared engine."""
+
+    def __init__(self, engine: AgentSelectorEngine):
+        self.engine = engine
         self._history = []  # type: ignore
 
+        # incremented when the history is compacted, i.e.
+        # when it changes other than by appending messages
+        self.generation = 0
+
+        # registry version at which the agents info in
+        # the history has last been checked for changes
+        self._agents_version: int | None = None
+
+    @property
+    def registry(self) -> AgentRegistry:
+        return self.engine.registry
+
+    @property
+    def settings(self) -> AgentSelectorSettings:
+        return self.engine.settings
+
     def get_state(self):
         """Get the serialized state of the selector agent."""
         return to_jsonable_python(self._history)
@@ -105,20 +253,35 @@ class AgentSelector:
     def set_state(self, state):
         """Set the state of the selector agent from serialized data."""
         self._history = ModelMessagesTypeAdapter.validate_python(state)
+        self._agents_version = None
 
-    async def instructions(self) -> str:
-        if self.settings.instructions_file and Path(self.settings.instructions_file).exists():
-            async with aiofiles.open(self.settings.instructions_file, "r") as f:
-                return await f.read()
-        else:
-            return self.settings.instructions
+    def skip(self, message: Message) -> bool:
+        """Whether the pre-selector rules out an agent for `message`."""
+        return self.engine.skip(message)
+
+    async def record(
+        self,
+        message: Message,
+        selection: AgentSelection,
+        response: AgentSelectionConfirmationResponse,
+    ):
+        """Log a confirmed or rejected selection for training a router."""
+        await self.engine.record(message, selection, response)
 
     async def run(self, message: Message) -> AgentSelectionResult:
-        prompt = format_message(message)
-        result = await self._agent.run(
-            user_prompt=prompt,
-            message_history=self._history,
-        )
+        if self._history:
+            await self._update_agents_info()
+
+        if routed := self.engine.route(message):
+            selection, confidence = routed
+            self._history.append(ModelRequest(parts=[UserPromptPart(content=format_message(message))]))
+            self._add_result(selection)
+            self._compact()
+
+            thought = f"Selected by router with confidence {confidence:.2f}"
+            return AgentSelectionResult(selection=selection, thoughts=[thought])
+
+        result = await self.engine.run(message, self._history)
         thoughts = []
         for msg in result.new_messages():
             self._history.append(msg)
@@ -126,26 +289,73 @@ class AgentSelector:
                 for part in msg.parts:
                     if isinstance(part, ThinkingPart) and part.has_content():
                         thoughts.append(part.content)
+        self._compact()
 
         return AgentSelectionResult(selection=result.output, thoughts=thoughts)
 
     async def add(self, message: Message):
-        init = len(self._history) == 0
         parts = []
 
         parts.append(UserPromptPart(content=format_message(message)))
         self._history.append(ModelRequest(parts=parts))
 
-        if init:
-            info = await self.registry.get_registered_agents()
+        await self._update_agents_info()
+        self._add_result(AgentSelection())
+        self._compact()
+
+    def _compact(self):
+        max_turns = self.settings.history_turns
+        if max_turns is None:
+            return
+
+        turns = [i for i, msg in enumerate(self._history) if _is_turn(msg)]
+        if len(turns) <= max_turns:
+            return
+
+        # Collapse older turns into a summary that is prepended to the
+        # first kept turn. Turns are only split at user prompts, so that
+        # tool calls and tool returns stay paired.
+        start = turns[len(turns) - max(max_turns // 2, 1)]
+        prompts = [
+            part.content.removeprefix(SUMMARY_PREFIX)
+            for msg in self._history[:start]
+            if isinstance(msg, ModelRequest)
+            for part in msg.parts
+            if isinstance(part, UserPromptPart) and isinstance(part.content, str)
+        ]
+        summary = UserPromptPart(content=SUMMARY_PREFIX + "\n".join(prompts)[-self.settings.summary_size :])
+
+        info = self._agents_info()
+        first = self._history[start]
+        self._history = [replace(first, parts=[summary, *first.parts]), *self._history[start + 1 :]]
+        self.generation += 1
+
+        if info is not None and self._agents_info() is None:
+            # keep the latest agents info if it was collapsed
             self._add_agents_info(info=info)
 
-        self._add_empty_result()
+    async def _update_agents_info(self):
+        # add the registered agents to the history if they
+        # changed since they have last been added
+        if self._agents_version == self.registry.version:
+            return
 
-    def _add_empty_result(self):
+        info = await self.registry.get_registered_agents()
+        if info != self._agents_info():
+            self._add_agents_info(info=info)
+        self._agents_version = self.registry.version
+
+    def _agents_info(self) -> str | None:
+        for msg in reversed(self._history):
+            for part in msg.parts:
+                if isinstance(part, ToolReturnPart) and part.tool_name == "get_registered_agents":
+                    return part.content
+        return None
+
+    def _add_result(self, selection: AgentSelection):
         tool_req = ToolCallPart(
             tool_name="final_result",
-            args={"agent_name": None, "query": None, "reasoning": None},
+            args={"agent_name": selection.agent_name, "query": selection.query, "reasoning": None},
         )
         tool_ret = ToolReturnPart(
             tool_name="final_result",
@@ -175,3 +385,7 @@ class AgentSelector:
                 ModelRequest(parts=[tool_ret]),
             ]
         )
+
+
+def _is_turn(msg: ModelMessage) -> bool:
+    return isinstance(msg, ModelRequest) and any(isinstance(part, UserPromptPart) for part in msg.parts)
@@ -0,0 +1,147 @@
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Collection, Sequence
+
+from hygroup.agent.base import Message
+
+GREETINGS = frozenset(
+    {
+        "hi",
+        "hello",
+        "hey",
+        "hi all",
+        "hello all",
+        "hey all",
+        "good morning",
+        "good night",
+        "bye",
+        "cheers",
+        "thanks",
+        "thank you",
+        "thanks a lot",
+        "thx",
+        "ty",
+        "ok",
+        "okay",
+        "k",
+        "cool",
+        "nice",
+        "great",
+        "awesome",
+        "perfect",
+        "lol",
+        "np",
+        "no problem",
+        "sounds good",
+        "got it",
+    }
+)
+
+# Slack emoji codes like :+1: or :tada:
+EMOJI_CODE_PATTERN = re.compile(r":[\w+-]+:")
+REACTION_PATTERN = re.compile(r"[+-]1")
+
+
+@dataclass
+class PreSelectionStats:
+    messages: int = 0
+    """Number of messages checked by the pre-selector."""
+
+    skipped: int = 0
+    """Number of messages for which agent selection was skipped."""
+
+    rules: Counter[str] = field(default_factory=Counter)
+    """Number of skipped messages per matching rule."""
+
+    @property
+    def hit_rate(self) -> float:
+        return self.skipped / self.messages if self.messages else 0.0
+
+
+class PreSelector(ABC):
+    """Cheap check in front of the agent selector.
+
+    Messages ruled out by the pre-selector are added to the selector's
+    history without running the selector's model.
+    """
+
+    def __init__(self):
+        self._stats = PreSelectionStats()
+
+    @property
+    def stats(self) -> PreSelectionStats:
+        """Hit rate metrics, aggregated over all checked messages."""
+        return self._stats
+
+    def skip(self, message: Message) -> bool:
+        """Whether agent selection can be skipped for `message`."""
+        rule = self.match(message)
+        self._stats.messages += 1
+        if rule is not None:
+            self._stats.skipped += 1
+            self._stats.rules[rule] += 1
+        return rule is not None
+
+    @abstractmethod
+    def match(self, message: Message) -> str | None:
+        """Returns the name of the rule that rules out an agent for
+        `message` or `None` if agent selection is required.
+        """
+
+
+class RulePreSelector(PreSelector):
+    """Rules out an agent for short messages, greetings and reactions.
+
+    Args:
+        min_length: Messages with fewer characters are skipped.
+        greetings: Skipped messages, compared in lower case and without
+            punctuation and emoji.
+        keywords: Messages containing one of these keywords (case-insensitive)
+            are never skipped.
+        patterns: Regular expressions of messages that explicitly
+            opt out of agent selection, e.g. `^/noagent`.
+    """
+
+    def __init__(
+        self,
+        min_length: int = 3,
+        greetings: Collection[str] = GREETINGS,
+        keywords: Sequence[str] = (),
+        patterns: Sequence[str] = (),
+    ):
+        super().__init__()
+        self.min_length = min_length
+        self.greetings = frozenset(greetings)
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+    def match(self, message: Message) -> str | None:
+        text = message.text.strip()
+        lower = text.lower()
+
+        if any(keyword in lower for keyword in self.keywords):
+            return None
+        if any(pattern.search(text) for pattern in self.patterns):
+            return "pattern"
+        if self._is_reaction(text):
+            return "reaction"
+        if self._normalize(lower) in self.greetings:
+            return "greeting"
+        if len(text) < self.min_length:
+            return "length"
+        return None
+
+    @staticmethod
+    def _is_reaction(text: str) -> bool:
+        if REACTION_PATTERN.fullmatch(text):
+            return True
+        # emoji and punctuation only
+        return not any(char.isalnum() for char in EMOJI_CODE_PATTERN.sub("", text))
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        text = EMOJI_CODE_PATTERN.sub(" ", text)
+        text = re.sub(r"[^\w\s]", " ", text)
+        return " ".join(text.split())
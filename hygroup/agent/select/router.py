@@ -0,0 +1,153 @@
+import json
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Sequence
+
+import aiofiles
+import numpy as np
+
+NO_AGENT = "<none>"
+"""Router label of decisions that no agent should be activated."""
+
+
+@dataclass
+class SelectionDecision:
+    text: str
+    """Text of the message the selection was made for."""
+
+    agent_name: str | None
+    """Name of the selected agent or `None` if no agent was selected."""
+
+    confirmed: bool
+    """Whether the user confirmed the selection."""
+
+    comment: str | None = None
+    """Comment of the user on the selection."""
+
+    def label(self) -> str | None:
+        """Router label of this decision or `None` if it is not usable for training.
+
+        A rejected agent selection means that no agent should be activated,
+        a rejected skip doesn't tell which agent should have been activated.
+        """
+        if self.confirmed:
+            return self.agent_name or NO_AGENT
+        if self.agent_name is not None:
+            return NO_AGENT
+        return None
+
+
+class SelectionLog:
+    """Append-only log of selection decisions, one JSON object per line."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+
+    async def append(self, decision: SelectionDecision):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        async with aiofiles.open(self.path, "a") as f:
+            await f.write(json.dumps(asdict(decision)) + "\n")
+
+    def read(self) -> list[SelectionDecision]:
+        if not self.path.exists():
+            return []
+        with self.path.open() as f:
+            return [SelectionDecision(**json.loads(line)) for line in f if line.strip()]
+
+
+def hash_features(text: str, dim: int) -> tuple[np.ndarray, np.ndarray]:
+    """Hashed word unigram and bigram features of `text`.
+
+    Returns the feature indices and their L2-normalized values.
+    """
+    words = text.lower().split()
+    ngrams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not ngrams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    hashes = [zlib.crc32(ngram.encode()) % dim for ngram in ngrams]
+    indices, counts = np.unique(np.array(hashes, dtype=np.int64), return_counts=True)
+    values = counts.astype(np.float32)
+    return indices, values / np.linalg.norm(values)
+
+
+@dataclass
+class Router:
+    """Logistic regression model that predicts the agent to select from message text.
+
+    Trained offline from logged selection decisions with `train_router`.
+    """
+
+    labels: list[str]
+    weights: np.ndarray
+    bias: np.ndarray
+
+    @property
+    def dim(self) -> int:
+        return self.weights.shape[0]
+
+    def predict(self, text: str) -> tuple[str | None, float]:
+        """Returns the predicted agent name (`None` for no agent) and the confidence of the prediction."""
+        indices, values = hash_features(text, self.dim)
+        logits = values @ self.weights[indices] + self.bias
+        probs = _softmax(logits)
+        best = int(np.argmax(probs))
+        label = self.labels[best]
+        return (None if label == NO_AGENT else label), float(probs[best])
+
+    def save(self, path: Path | str):
+        with Path(path).open("wb") as f:
+            np.savez(f, labels=np.array(self.labels), weights=self.weights, bias=self.bias)
+
+    @staticmethod
+    def load(path: Path | str) -> "Router":
+        with np.load(path) as data:
+            return Router(labels=data["labels"].tolist(), weights=data["weights"], bias=data["bias"])
+
+
+def train_router(
+    decisions: Sequence[SelectionDecision],
+    dim: int = 2**14,
+    epochs: int = 200,
+    learning_rate: float = 1.0,
+    l2: float = 1e-4,
+) -> Router:
+    """Train a multinomial logistic regression router with full-batch gradient descent."""
+    examples = [(decision.text, label) for decision in decisions if (label := decision.label()) is not None]
+    if not examples:
+        raise ValueError("No usable selection decisions")
+
+    labels = sorted({label for _, label in examples})
+    targets = np.array([labels.index(label) for _, label in examples])
+
+    # sparse feature matrix in coordinate format
+    rows, cols, vals = [], [], []
+    for row, (text, _) in enumerate(examples):
+        indices, values = hash_features(text, dim)
+        rows.append(np.full(len(indices), row))
+        cols.append(indices)
+        vals.append(values)
+    row_idx, col_idx, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+
+    n, k = len(examples), len(labels)
+    weights = np.zeros((dim, k), dtype=np.float32)
+    bias = np.zeros(k, dtype=np.float32)
+    onehot = np.eye(k, dtype=np.float32)[targets]
+
+    for _ in range(epochs):
+        logits = np.zeros((n, k), dtype=np.float32)
+        np.add.at(logits, row_idx, values[:, None] * weights[col_idx])
+        delta = (_softmax(logits + bias) - onehot) / n
+
+        grad = np.zeros_like(weights)
+        np.add.at(grad, col_idx, values[:, None] * delta[row_idx])
+        weights -= learning_rate * (grad + l2 * weights)
+        bias -= learning_rate * delta.sum(axis=0)
+
+    return Router(labels=labels, weights=weights, bias=bias)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
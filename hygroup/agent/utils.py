@@ -1,32 +1,93 @@
+import hashlib
 import importlib
+import inspect
+import json
+from typing import Any
 
+import httpx
 from pydantic_ai.models import Model
 
 
-def model_from_dict(model_dict: dict) -> Model:
+class ProviderRegistry:
+    """Model providers shared by all agents and selectors of a process.
+
+    Providers are keyed by provider class and args, so that models configured
+    with the same provider share a provider instance. Providers that accept an
+    `http_client` additionally share a single HTTP client whose keep-alive
+    connection pool is bounded by `limits`. Keys are hashes, provider args
+    (which usually contain API keys) are not retained by the registry.
+    """
+
+    def __init__(self, limits: httpx.Limits | None = None, timeout: float = 600.0, connect_timeout: float = 5.0):
+        self.limits = limits or httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._providers: dict[str, Any] = {}
+        self._http_client: httpx.AsyncClient | None = None
+
+    def __len__(self) -> int:
+        return len(self._providers)
+
+    def provider(self, provider_class_name: str, provider_args: dict[str, Any]) -> Any:
+        """Get or create the provider of class `provider_class_name` with `provider_args`."""
+        data = json.dumps([provider_class_name, provider_args], sort_keys=True, default=str)
+        key = hashlib.sha256(data.encode()).hexdigest()
+        if (provider := self._providers.get(key)) is not None:
+            return provider
+
+        provider_class = _import(provider_class_name)
+        args = dict(provider_args)
+
+        # providers configured with their own client don't use the shared one
+        params = inspect.signature(provider_class).parameters
+        if "http_client" in params and not any(name.endswith("_client") for name in args):
+            args["http_client"] = self.http_client()
+
+        provider = self._providers[key] = provider_class(**args)
+        return provider
+
+    def http_client(self) -> httpx.AsyncClient:
+        """The HTTP client shared by all providers of this registry."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            # providers still referencing a closed client are recreated
+            self._providers.clear()
+        return self._http_client
+
+    async def close(self):
+        """Close the shared HTTP client and remove all providers."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._providers.clear()
+
+
+providers = ProviderRegistry()
+"""Process-wide provider registry used by `model_from_dict`."""
+
+
+def model_from_dict(model_dict: dict, provider_registry: ProviderRegistry | None = None) -> Model:
     # Extract model configuration
     model_args = model_dict["args"].copy()
 
     # Check if provider configuration exists
     if "provider" in model_args:
         provider_config = model_args["provider"]
-        provider_class_name = provider_config["class"]
-        provider_args = provider_config["args"]
 
-        # Import and instantiate provider
-        module_name, class_name = provider_class_name.rsplit(".", 1)
-        provider_module = importlib.import_module(module_name)
-        provider_class = getattr(provider_module, class_name)
-        provider = provider_class(**provider_args)
+        # Get shared provider instance
+        registry = providers if provider_registry is None else provider_registry
+        provider = registry.provider(provider_config["class"], provider_config["args"])
 
         # Replace provider config with instantiated provider
         model_args["provider"] = provider
 
     # Import and instantiate model
-    model_class_name = model_dict["class"]
-    module_name, class_name = model_class_name.rsplit(".", 1)
-    model_module = importlib.import_module(module_name)
-    model_class = getattr(model_module, class_name)
+    model_class = _import(model_dict["class"])
     model = model_class(**model_args)
 
     return model
+
+
+def _import(class_name: str) -> Any:
+    module_name, class_name = class_name.rsplit(".", 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
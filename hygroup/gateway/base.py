@@ -7,8 +7,22 @@ class Gateway(ABC):
     @abstractmethod
     async def start(self, join: bool = True): ...
 
+    async def close(self):
+        """Close the sessions held by this gateway."""
+        pass
+
     @abstractmethod
     async def handle_agent_response(self, response: AgentResponse, sender: str, receiver: str, session_id: str): ...
 
+    @property
+    def streaming(self) -> bool:
+        """Whether agent responses are streamed to this gateway.
+
+        If `True`, `handle_agent_response` is called with partial responses
+        (`final=False`), each containing the text delta to the previous one,
+        followed by the final response containing the complete text.
+        """
+        return False
+
     async def handle_agent_activation(self, agent_name: str | None, message_id: str, session_id: str):
         pass
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Generic, Iterator, Protocol, TypeVar
+
+from hygroup.gateway.locks import LockManager
+from hygroup.session import Session
+
+logger = logging.getLogger(__name__)
+
+
+class SessionHolder(Protocol):
+    @property
+    def session(self) -> Session: ...
+
+
+T = TypeVar("T", bound=SessionHolder)
+
+
+class SessionCache(Generic[T]):
+    """LRU cache of gateway conversations (e.g. Slack threads) and their sessions.
+
+    Conversations are evicted if their session has been idle for more than
+    `idle_ttl` seconds, or, least recently used first, if the cache holds more
+    than `max_size` conversations. Sessions with pending or running work are
+    never evicted. Evicted sessions are closed, which saves their state, stops
+    their workers and agents, and releases session-scoped MCP servers. Gateways
+    restore them with `SessionManager.load_session` on the next event.
+
+    Args:
+        max_size: Maximum number of cached conversations (`None` for no limit).
+        idle_ttl: Idle time in seconds after which a session is evicted (`None` to disable).
+        sweep_interval: Interval in seconds for checking for evictable sessions.
+        locks: If provided, a conversation's lock is held while it is evicted.
+    """
+
+    def __init__(
+        self,
+        max_size: int | None = 1000,
+        idle_ttl: float | None = 3600.0,
+        sweep_interval: float = 60.0,
+        locks: LockManager | None = None,
+    ):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+
+        self._locks = locks
+        self._entries: OrderedDict[str, T] = OrderedDict()
+        self._sweep_task: asyncio.Task | None = None
+        self._sweep_event = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str) -> T:
+        return self._entries[key]
+
+    def __setitem__(self, key: str, value: T):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        if self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+        if self.max_size is not None and len(self._entries) > self.max_size:
+            self._sweep_event.set()
+
+    def get(self, key: str) -> T | None:
+        """Return the conversation cached under `key` and mark it as recently used."""
+        if value := self._entries.get(key):
+            self._entries.move_to_end(key)
+        return value
+
+    def values(self) -> Iterator[T]:
+        return iter(list(self._entries.values()))
+
+    async def sweep(self) -> int:
+        """Evict expired and, if over budget, least recently used idle sessions.
+
+        Returns:
+            The number of evicted sessions.
+        """
+        evicted = 0
+
+        for key, value in list(self._entries.items()):
+            over_budget = self.max_size is not None and len(self._entries) > self.max_size
+            expired = self.idle_ttl is not None and value.session.idle_time() > self.idle_ttl
+
+            if (over_budget or expired) and await self.evict(key):
+                evicted += 1
+
+        return evicted
+
+    async def evict(self, key: str) -> bool:
+        """Close the session cached under `key` and remove it from the cache, if idle."""
+        if self._locks is None:
+            return await self._evict(key)
+
+        async with self._locks.acquire(key):
+            return await self._evict(key)
+
+    async def close(self):
+        """Stop sweeping and close all cached sessions."""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            await asyncio.gather(self._sweep_task, return_exceptions=True)
+            self._sweep_task = None
+
+        for key in list(self._entries.keys()):
+            value = self._entries.pop(key)
+            await value.session.close()
+
+    async def _evict(self, key: str) -> bool:
+        value = self._entries.get(key)
+
+        if value is None or not value.session.idle:
+            return False
+
+        del self._entries[key]
+        await value.session.close()
+
+        logger.debug(f"Evicted session {value.session.id}")
+        return True
+
+    async def _sweep_loop(self):
+        while True:
+            try:
+                async with asyncio.timeout(self.sweep_interval):
+                    await self._sweep_event.wait()
+            except TimeoutError:
+                pass
+
+            self._sweep_event.clear()
+
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.exception(e)
@@ -12,6 +12,7 @@ from hygroup.agent import (
     Message,
 )
 from hygroup.gateway import Gateway
+from hygroup.gateway.cache import SessionCache
 from hygroup.gateway.github.events import (
     GithubEvent,
     IssueCommentCreated,
@@ -24,6 +25,7 @@ from hygroup.gateway.github.events import (
 from hygroup.gateway.github.service import GithubService
 from hygroup.gateway.github.webhook.app import create_app
 from hygroup.gateway.github.webhook.config import AppSettings
+from hygroup.gateway.locks import LockManager
 from hygroup.gateway.utils import extract_initial_mention, resolve_mentions
 from hygroup.session import Session, SessionManager
 
@@ -64,6 +66,8 @@ class GithubGateway(Gateway):
         github_private_key: str,
         github_app_username: str,
         user_mapping: dict[str, str] = {},
+        session_cache_size: int | None = 1000,
+        session_idle_ttl: float | None = 3600.0,
     ):
         self._session_manager = session_manager
         self._github_app_username = github_app_username
@@ -96,13 +100,23 @@ class GithubGateway(Gateway):
         )
 
         self._webhooks_app_server = uvicorn.Server(self._webhooks_app_config)
-        self._conversations: dict[str, GithubConversation] = {}
+        self._locks = LockManager()
+        # Sessions of idle conversations are closed and later restored from
+        # the session store when the conversation becomes active again.
+        self._conversations: SessionCache[GithubConversation] = SessionCache(
+            max_size=session_cache_size,
+            idle_ttl=session_idle_ttl,
+            locks=self._locks,
+        )
 
     async def start(self, join: bool = True):
         serve_task = asyncio.create_task(self._webhooks_app_server.serve())
         if join:
             await serve_task
 
+    async def close(self):
+        await self._conversations.close()
+
     def _resolve_system_user_id(self, github_user_id: str) -> str:
         return self._github_user_mapping.get(github_user_id, github_user_id)
 
@@ -135,6 +149,11 @@ class GithubGateway(Gateway):
             logger.warning("Unknown event type (event_type='%s')", event_type)
             return
 
+        # events of the same conversation are handled sequentially
+        async with self._locks.acquire(self._conversation_id(event)):
+            await self._handle_conversation_event(event)
+
+    async def _handle_conversation_event(self, event: GithubEvent):
         match event:
             case IssueOpened() | PullRequestOpened() as opened_event:
                 conversation_id = self._conversation_id(opened_event)
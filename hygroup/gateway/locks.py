@@ -0,0 +1,78 @@
+import time
+from asyncio import Lock
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+
+@dataclass
+class LockStats:
+    acquisitions: int = 0
+    """Number of lock acquisitions."""
+
+    contended: int = 0
+    """Number of acquisitions that had to wait for another holder."""
+
+    wait_time: float = 0.0
+    """Total time (in seconds) spent waiting for locks."""
+
+    max_wait_time: float = 0.0
+    """Longest time (in seconds) spent waiting for a lock."""
+
+    @property
+    def mean_wait_time(self) -> float:
+        return self.wait_time / self.acquisitions if self.acquisitions else 0.0
+
+
+class LockManager:
+    """Manages one lock per key.
+
+    Work on the same key (e.g. a Slack thread) is serialized while work on
+    different keys runs concurrently. Locks are created on demand and dropped
+    as soon as they are neither held nor awaited, so the number of locks is
+    bounded by the number of keys currently in use.
+    """
+
+    def __init__(self):
+        self._locks: dict[str, Lock] = {}
+        self._refs: dict[str, int] = {}
+        self._stats = LockStats()
+
+    @property
+    def stats(self) -> LockStats:
+        """Lock wait time metrics, aggregated over all keys."""
+        return self._stats
+
+    def locked(self, key: str) -> bool:
+        lock = self._locks.get(key)
+        return lock is not None and lock.locked()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def acquire(self, key: str) -> AsyncIterator[None]:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = Lock()
+
+        self._refs[key] = self._refs.get(key, 0) + 1
+
+        try:
+            contended = lock.locked()
+            start = time.perf_counter()
+            async with lock:
+                self._record(time.perf_counter() - start, contended)
+                yield
+        finally:
+            self._refs[key] -= 1
+            if self._refs[key] == 0:
+                del self._refs[key]
+                del self._locks[key]
+
+    def _record(self, wait_time: float, contended: bool):
+        self._stats.acquisitions += 1
+        self._stats.wait_time += wait_time
+        self._stats.max_wait_time = max(self._stats.max_wait_time, wait_time)
+        if contended:
+            self._stats.contended += 1
@@ -5,7 +5,7 @@ from slack_bolt.async_app import AsyncApp
 from slack_sdk.web.async_client import AsyncWebClient
 
 from hygroup.agent.default.registry import DefaultAgentRegistry
-from hygroup.agent.select.agent import AgentSelectorSettings
+from hygroup.agent.select.agent import AgentSelectorEngine, AgentSelectorSettings
 from hygroup.gateway.slack.app_home.agent.handlers import AgentConfigHandlers
 from hygroup.gateway.slack.app_home.policy.handlers import ActivationPolicyConfigHandlers
 from hygroup.gateway.slack.app_home.preferences.handlers import UserPreferenceConfigHandlers
@@ -24,6 +24,7 @@ class SlackHomeHandlers:
         agent_registry: Registry containing available agents and their configurations
         system_editor_ids: List of Slack user IDs authorized to edit system-wide settings.
             If None, all users can edit system configurations.
+        selector_engine: Agent selector engine that reloads the activation policy when it is edited
     """
 
     def __init__(
@@ -35,6 +36,7 @@ class SlackHomeHandlers:
         preference_store: DefaultPreferenceStore,
         selector_settings: AgentSelectorSettings,
         system_editor_ids: list[str] | None = None,
+        selector_engine: AgentSelectorEngine | None = None,
     ):
         self._client = client
         self._app = app
@@ -46,7 +48,9 @@ class SlackHomeHandlers:
         self._user_preference_config_handlers = UserPreferenceConfigHandlers(
             client, preference_store, self._resolve_system_user_id
         )
-        self._activation_policy_config_handlers = ActivationPolicyConfigHandlers(client, selector_settings)
+        self._activation_policy_config_handlers = ActivationPolicyConfigHandlers(
+            client, selector_settings, selector_engine
+        )
 
         self._app_name: str | None = None
 
@@ -4,16 +4,22 @@ from pathlib import Path
 import aiofiles
 from slack_sdk.web.async_client import AsyncWebClient
 
-from hygroup.agent.select.agent import AgentSelectorSettings
+from hygroup.agent.select.agent import AgentSelectorEngine, AgentSelectorSettings
 from hygroup.gateway.slack.app_home.policy.views import ActivationPolicyViewBuilder
 
 logger = logging.getLogger(__name__)
 
 
 class ActivationPolicyConfigHandlers:
-    def __init__(self, client: AsyncWebClient, selector_settings: AgentSelectorSettings):
+    def __init__(
+        self,
+        client: AsyncWebClient,
+        selector_settings: AgentSelectorSettings,
+        selector_engine: AgentSelectorEngine | None = None,
+    ):
         self._client = client
         self._selector_settings = selector_settings
+        self._selector_engine = selector_engine
 
     def _custom_policy_file(self) -> Path | None:
         if not self._selector_settings.instructions_file:
@@ -32,6 +38,8 @@ class ActivationPolicyConfigHandlers:
     async def _set_custom_policy(self, policy: str):
         async with aiofiles.open(self._custom_policy_file(), "w") as f:
             await f.write(policy)
+        if self._selector_engine is not None:
+            self._selector_engine.invalidate_instructions()
 
     async def handle_activation_policy_overflow(self, ack, body, client):
         await ack()
@@ -1,6 +1,6 @@
 import logging
 import os
-from asyncio import Lock
+import time
 from dataclasses import dataclass, field
 from uuid import uuid4
 
@@ -16,18 +16,29 @@ from hygroup.agent import (
     PermissionRequest,
 )
 from hygroup.gateway.base import Gateway
+from hygroup.gateway.cache import SessionCache
+from hygroup.gateway.locks import LockManager, LockStats
 from hygroup.gateway.utils import extract_initial_mention, resolve_mentions
 from hygroup.session import Session, SessionManager
 from hygroup.user import RequestHandler
 
 
+@dataclass
+class SlackStream:
+    """Slack message of a streamed agent response, updated in place."""
+
+    text: str = ""
+    ts: str | None = None
+    updated: float = 0.0
+
+
 @dataclass
 class SlackThread:
     channel: str
     session: Session
     permission_requests: dict[str, PermissionRequest] = field(default_factory=dict)
+    streams: dict[str, SlackStream] = field(default_factory=dict)
     activated: bool = False
-    lock: Lock = Lock()
 
     @property
     def id(self) -> str:
@@ -71,10 +82,20 @@ class SlackGateway(Gateway, RequestHandler):
         session_manager: SessionManager,
         user_mapping: dict[str, str] = {},
         handle_permission_requests: bool = False,
+        session_cache_size: int | None = 1000,
+        session_idle_ttl: float | None = 3600.0,
+        stream_responses: bool = False,
+        stream_update_interval: float = 1.0,
     ):
         self.session_manager = session_manager
         self.delegate_handler = session_manager.request_handler
 
+        # If True, agent responses are posted when the first partial response
+        # arrives and then updated in place, at most once per update interval
+        # (chat.update is rate-limited), and finally with the complete text.
+        self._stream_responses = stream_responses
+        self._stream_update_interval = stream_update_interval
+
         if handle_permission_requests:
             # Gateway handles permission requests itself, delegating
             # all other requests to the original request handler.
@@ -89,7 +110,14 @@ class SlackGateway(Gateway, RequestHandler):
         self._client = AsyncWebClient(token=os.environ["SLACK_BOT_TOKEN"])
         self._handler = AsyncSocketModeHandler(self._app, os.environ["SLACK_APP_TOKEN"])
         self._converter = SlackMarkdownConverter()
-        self._threads: dict[str, SlackThread] = {}
+        self._locks = LockManager()
+        # Sessions of idle threads are closed and later restored
+        # from the session store when the thread becomes active again.
+        self._threads: SessionCache[SlackThread] = SessionCache(
+            max_size=session_cache_size,
+            idle_ttl=session_idle_ttl,
+            locks=self._locks,
+        )
 
         # register event handlers
         self._app.message("")(self.handle_slack_message)
@@ -110,12 +138,23 @@ class SlackGateway(Gateway, RequestHandler):
     def client(self) -> AsyncWebClient:
         return self._client
 
+    @property
+    def lock_stats(self) -> LockStats:
+        return self._locks.stats
+
+    @property
+    def streaming(self) -> bool:
+        return self._stream_responses
+
     async def start(self, join: bool = True):
         if join:
             await self._handler.start_async()
         else:
             await self._handler.connect_async()
 
+    async def close(self):
+        await self._threads.close()
+
     async def handle_feedback_request(self, *args, **kwargs):
         await self.delegate_handler.handle_feedback_request(*args, **kwargs)
 
@@ -142,13 +181,47 @@ class SlackGateway(Gateway, RequestHandler):
     async def handle_agent_response(self, response: AgentResponse, sender: str, receiver: str, session_id: str):
         thread = self._threads[session_id]
 
+        if not response.final:
+            await self._handle_partial_response(thread, response, sender, receiver)
+            return
+
+        text, blocks = self._format_agent_response(response.text, receiver, response.handoffs)
+
+        stream = thread.streams.pop(sender, None)
+        if stream is not None and stream.ts is not None:
+            # replace the streamed text with the final response
+            await self._client.chat_update(channel=thread.channel, ts=stream.ts, text=text, blocks=blocks)
+        else:
+            await self._post_slack_message(thread, text, sender, blocks=blocks)
+
+    async def _handle_partial_response(self, thread: SlackThread, response: AgentResponse, sender: str, receiver: str):
+        stream = thread.streams.setdefault(sender, SlackStream())
+        stream.text += response.text
+
+        now = time.monotonic()
+        if stream.ts is not None and now - stream.updated < self._stream_update_interval:
+            # coalesced with later deltas into the next update
+            return
+
+        text, blocks = self._format_agent_response(stream.text, receiver)
+
+        if stream.ts is None:
+            result = await self._post_slack_message(thread, text, sender, blocks=blocks)
+            stream.ts = result["ts"]
+        else:
+            await self._client.chat_update(channel=thread.channel, ts=stream.ts, text=text, blocks=blocks)
+
+        stream.updated = now
+
+    def _format_agent_response(
+        self, response_text: str, receiver: str, handoffs: dict[str, str] | None = None
+    ) -> tuple[str, list[dict]]:
         receiver_resolved = self._resolve_slack_user_id(receiver)
         receiver_resolved_formatted = f"<@{receiver_resolved}>"
 
-        response_text = response.text
-        if response.handoffs:
+        if handoffs:
             response_text += "\n\n**Handoffs:**"
-            for agent, query in response.handoffs.items():
+            for agent, query in handoffs.items():
                 response_text += f"\n- `{agent}`: {query}"
 
         text = f"{receiver_resolved_formatted} {response_text}"
@@ -161,7 +234,7 @@ class SlackGateway(Gateway, RequestHandler):
                 },
             },
         ]
-        await self._post_slack_message(thread, text, sender, blocks=blocks)
+        return text, blocks
 
     async def handle_permission_request(self, request: PermissionRequest, sender: str, receiver: str, session_id: str):  # type: ignore
         corr_id = str(uuid4())
@@ -265,7 +338,7 @@ class SlackGateway(Gateway, RequestHandler):
         else:
             coro = self._client.chat_postMessage
 
-        await coro(
+        return await coro(
             channel=thread.channel,
             thread_ts=thread.id,
             text=text,
@@ -306,32 +379,33 @@ class SlackGateway(Gateway, RequestHandler):
 
         if "thread_ts" in message:
             thread_id = message["thread_ts"]
-            thread = self._threads.get(thread_id)
 
-            if not thread:
+            # Messages of the same thread are processed sequentially, messages
+            # of different threads concurrently. Lookup and registration of a
+            # thread happen under the thread's lock so that concurrent initial
+            # messages don't load or create the same session twice.
+            async with self._locks.acquire(thread_id):
+                if thread := self._threads.get(thread_id):
+                    await thread.handle_message(msg)
+                    return
+
                 if session := await self.session_manager.load_session(id=thread_id):
                     thread = self._register_slack_thread(channel_id=msg["channel"], session=session)
                 else:
                     session = self.session_manager.create_session(id=thread_id)
                     thread = self._register_slack_thread(channel_id=msg["channel"], session=session)
 
-                async with thread.lock:
-                    history = await self._load_thread_history(
-                        channel=msg["channel"],
-                        thread_ts=thread_id,
-                    )
-                    for entry in history:
-                        await thread.handle_message(entry)
-                    return
-
-            async with thread.lock:
-                await thread.handle_message(msg)
+                history = await self._load_thread_history(
+                    channel=msg["channel"],
+                    thread_ts=thread_id,
+                )
+                for entry in history:
+                    await thread.handle_message(entry)
 
         else:
-            session = self.session_manager.create_session(id=msg["id"])
-            thread = self._register_slack_thread(channel_id=msg["channel"], session=session)
-
-            async with thread.lock:
+            async with self._locks.acquire(msg["id"]):
+                session = self.session_manager.create_session(id=msg["id"])
+                thread = self._register_slack_thread(channel_id=msg["channel"], session=session)
                 await thread.handle_message(msg)
 
     def _register_slack_thread(self, channel_id: str, session: Session) -> SlackThread:
@@ -4,15 +4,19 @@ import os
 from pathlib import Path
 
 import aiofiles
+import httpx
 from dotenv import load_dotenv
 
 from hygroup.agent.default import DefaultAgentRegistry
-from hygroup.agent.select import AgentSelectorSettings
+from hygroup.agent.default.mcp import default_pools
+from hygroup.agent.select import AgentSelectorSettings, Router
+from hygroup.agent.utils import providers
 from hygroup.gateway import Gateway
 from hygroup.gateway.github import GithubGateway
 from hygroup.gateway.slack import SlackGateway, SlackHomeHandlers
 from hygroup.gateway.terminal import TerminalGateway
 from hygroup.session import SessionManager
+from hygroup.store import JsonSessionStore, SessionStore, SqliteSessionStore
 from hygroup.user import RequestHandler
 from hygroup.user.default import (
     DefaultPermissionStore,
@@ -40,6 +44,12 @@ async def main(args):
     if args.user_channel == "slack" and args.gateway != "slack":
         raise ValueError("The 'slack' user channel is only available with the 'slack' gateway.")
 
+    # Connection pool shared by all model providers
+    providers.limits = httpx.Limits(
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_keepalive_connections,
+    )
+
     # Database for tool execution permissions (session, permanent)
     permission_store = DefaultPermissionStore()
 
@@ -76,6 +86,23 @@ async def main(args):
         async with aiofiles.open(selector_settings.instructions_file, "w") as f:
             await f.write(selector_settings.instructions)
 
+    # Log selection decisions for training a local router with
+    # hygroup.scripts.train_router, and use the router if trained.
+    selector_settings.decisions_file = Path(".data", "agents", "selections.jsonl")
+    router_file = Path(".data", "agents", "router.npz")
+    if router_file.exists():
+        selector_settings.router = Router.load(router_file)
+        selector_settings.router_threshold = args.router_threshold
+
+    # Persistence of session state, one JSON file per
+    # session or a single SQLite database.
+    session_store: SessionStore
+    match args.session_store:
+        case "sqlite":
+            session_store = SqliteSessionStore()
+        case _:
+            session_store = JsonSessionStore()
+
     # Manages group sessions and their persistence.
     manager = SessionManager(
         agent_registry=agent_registry,
@@ -83,6 +110,7 @@ async def main(args):
         permission_store=permission_store,
         request_handler=request_handler,
         selector_settings=selector_settings,
+        store=session_store,
     )
 
     # A gateway provides connectivity to platforms like Slack, GitHub, or a terminal.
@@ -97,6 +125,12 @@ async def main(args):
                 # If True, prompt users in Slack to approve
                 # tool execution via ephemeral messages.
                 handle_permission_requests=args.user_channel == "slack",
+                # Sessions of idle threads are saved and closed.
+                session_cache_size=args.session_cache_size,
+                session_idle_ttl=args.session_idle_ttl,
+                # If True, agent responses are streamed and
+                # updated in place in Slack.
+                stream_responses=args.stream_responses,
             )
             handlers = SlackHomeHandlers(
                 client=gateway.client,
@@ -105,6 +139,8 @@ async def main(args):
                 user_registry=user_registry,
                 preference_store=preference_store,
                 selector_settings=selector_settings,
+                # reloads the activation policy when edited
+                selector_engine=manager.selector_engine,
             )
             handlers.register()
         case "github":
@@ -115,13 +151,24 @@ async def main(args):
                 github_installation_id=int(os.environ["GITHUB_APP_INSTALLATION_ID"]),
                 github_private_key=Path(os.environ["GITHUB_APP_PRIVATE_KEY_PATH"]).read_text(),
                 github_app_username=os.environ["GITHUB_APP_USERNAME"],
+                session_cache_size=args.session_cache_size,
+                session_idle_ttl=args.session_idle_ttl,
             )
         case "terminal":
             gateway = TerminalGateway(
                 session_manager=manager,
             )
 
-    await gateway.start(join=True)
+    try:
+        await gateway.start(join=True)
+    finally:
+        # Sessions save pending changes on close, so close them before the store.
+        # Closing sessions releases their leases of pooled MCP servers.
+        await gateway.close()
+        await default_pools().close()
+        session_store.close()
+        await permission_store.close()
+        await providers.close()
 
 
 if __name__ == "__main__":
@@ -154,6 +201,48 @@ if __name__ == "__main__":
         choices=["slack", "terminal"],
         help="Channel for permission requests. If not provided, requests are auto-approved.",
     )
+    parser.add_argument(
+        "--session-store",
+        type=str,
+        default="json",
+        choices=["json", "sqlite"],
+        help="Storage backend for session state.",
+    )
+    parser.add_argument(
+        "--session-cache-size",
+        type=int,
+        default=1000,
+        help="Maximum number of sessions kept in memory by the Slack and GitHub gateways.",
+    )
+    parser.add_argument(
+        "--session-idle-ttl",
+        type=float,
+        default=3600.0,
+        help="Idle time in seconds after which a session is saved and removed from memory.",
+    )
+    parser.add_argument(
+        "--router-threshold",
+        type=float,
+        default=0.9,
+        help="Minimum confidence of a trained router's selection. The selector model decides otherwise.",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=100,
+        help="Maximum number of HTTP connections shared by all model providers.",
+    )
+    parser.add_argument(
+        "--max-keepalive-connections",
+        type=int,
+        default=20,
+        help="Maximum number of idle HTTP connections kept alive for reuse by model providers.",
+    )
+    parser.add_argument(
+        "--stream-responses",
+        action="store_true",
+        help="Stream agent responses to Slack, updating messages in place.",
+    )
 
     args = parser.parse_args()
     asyncio.run(main(args=args))
@@ -0,0 +1,45 @@
+import argparse
+from collections import Counter
+from pathlib import Path
+
+from hygroup.agent.select.router import SelectionLog, train_router
+
+
+def main(args):
+    decisions = SelectionLog(args.decisions_file).read()
+    router = train_router(decisions, dim=args.dim, epochs=args.epochs)
+    router.save(args.router_file)
+
+    labels = Counter(label for decision in decisions if (label := decision.label()) is not None)
+    print(f"Trained router on {sum(labels.values())} decisions: {dict(labels)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train an agent selection router from logged selection decisions")
+    parser.add_argument(
+        "--decisions-file",
+        type=Path,
+        default=Path(".data", "agents", "selections.jsonl"),
+        help="Path to the selection decisions log.",
+    )
+    parser.add_argument(
+        "--router-file",
+        type=Path,
+        default=Path(".data", "agents", "router.npz"),
+        help="Path to the trained router file.",
+    )
+    parser.add_argument(
+        "--dim",
+        type=int,
+        default=2**14,
+        help="Number of hashed n-gram features.",
+    )
+    parser.add_argument(
+        "--epochs",
+        type=int,
+        default=200,
+        help="Number of training epochs.",
+    )
+
+    args = parser.parse_args()
+    main(args=args)
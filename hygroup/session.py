@@ -1,14 +1,13 @@
-import json
+import asyncio
 import logging
 import re
+import time
 import uuid
 from asyncio import Future, Queue, Task, create_task, sleep
-from dataclasses import asdict
+from collections import Counter, OrderedDict
+from dataclasses import asdict, replace
 from pathlib import Path
-from typing import Any
-
-import aiofiles
-import aiofiles.os
+from typing import Any, Iterable, Mapping
 
 from hygroup.agent import (
     Agent,
@@ -17,6 +16,7 @@ from hygroup.agent import (
     AgentResponse,
     AgentSelectionConfirmationRequest,
     AgentSelector,
+    AgentSelectorEngine,
     AgentSelectorSettings,
     FeedbackRequest,
     Message,
@@ -24,74 +24,148 @@ from hygroup.agent import (
     Thread,
 )
 from hygroup.gateway import Gateway
+from hygroup.store import JsonSessionStore, SessionStore
 from hygroup.user import PermissionStore, RequestHandler, UserRegistry
 
 logger = logging.getLogger(__name__)
 
 
+def message_to_dict(message: Message) -> dict[str, Any]:
+    """Serialize `message`, storing referenced threads by session id and version.
+
+    The version of a thread reference is the number of messages the referenced
+    thread had when it was referenced. Threads are append-only, so the first
+    `version` messages of the thread are the referenced snapshot.
+    """
+    data = asdict(replace(message, threads=[]))
+    data["threads"] = [{"session_id": thread.session_id, "version": len(thread.messages)} for thread in message.threads]
+    return data
+
+
+def message_from_dict(data: dict[str, Any], threads: Mapping[str, Thread]) -> Message:
+    """Deserialize a message, resolving its thread references with `threads`.
+
+    References to threads not contained in `threads` are dropped.
+    """
+    resolved = []
+    for ref in data.get("threads", []):
+        if "messages" in ref:
+            # thread copy embedded by earlier versions
+            messages = [message_from_dict(message, {}) for message in ref["messages"]]
+            resolved.append(Thread(session_id=ref["session_id"], messages=messages))
+        elif thread := threads.get(ref["session_id"]):
+            if ref["version"] < len(thread.messages):
+                thread = Thread(session_id=thread.session_id, messages=thread.messages[: ref["version"]])
+            resolved.append(thread)
+    return Message(**(data | {"threads": resolved}))
+
+
+def thread_references(messages: Iterable[dict[str, Any]]) -> set[str]:
+    """Session ids of threads referenced by serialized `messages`."""
+    return {ref["session_id"] for message in messages for ref in message.get("threads", []) if "messages" not in ref}
+
+
 class SessionAgent:
     def __init__(self, agent: Agent, session: "Session"):
         self.agent = agent
         self.session = session
-        self._updates: list[Message] = session.messages.copy()
+        # Registry version of the agent's config when the agent was created.
+        self.version = session.agent_registry.agent_version(agent.name)
+        # Position in the session's message log up to which the agent has
+        # received messages. Messages after the cursor are pending updates.
+        self._cursor = 0
+        # Outside group sessions, agents only receive messages that
+        # were added before they joined the session.
+        self._joined = len(session.messages)
         self._queue: Queue = Queue()
+        self._busy = False
         self._task = create_task(self.worker())
 
+    @property
+    def key(self) -> str:
+        return f"agent:{self.agent.name}"
+
     def get_state(self) -> dict[str, Any]:
         return {
-            "updates": [asdict(update) for update in self._updates],
+            "cursor": self._cursor,
             "history": self.agent.get_state(),
         }
 
     def set_state(self, state: dict[str, Any]):
-        self._updates = [Message(**update) for update in state["updates"]]
+        if "cursor" in state:
+            self._cursor = state["cursor"]
+        else:
+            # pending updates stored by earlier versions are the tail of the log
+            self._cursor = max(len(self.session.messages) - len(state.get("updates", [])), 0)
         self.agent.set_state(state["history"])
 
-    async def update(self, message: Message):
-        await self._queue.put(message)
+    def pending_updates(self, end: int | None = None) -> list[Message]:
+        """Messages from others after the cursor and before `end` (default: log end)."""
+        messages = self.session.messages
+        end = len(messages) if end is None else end
+        if not self.session.group:
+            end = min(end, self._joined)
+        name = self.agent.name
+        return [m for m in messages[self._cursor : end] if name not in (m.sender, m.receiver)]
+
+    @property
+    def idle(self) -> bool:
+        return self._queue.empty() and not self._busy
+
+    async def close(self):
+        # cancelling the worker exits the agent's session
+        # scope which also stops session-scoped MCP servers
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
 
     async def invoke(self, request: AgentRequest, secrets: dict[str, str] | None = None):
-        await self._queue.put((request, secrets))
+        # updates of this request are the messages logged before the request
+        await self._queue.put((request, secrets, len(self.session.messages)))
 
     async def worker(self):
         async with self.agent.session_scope():
             while True:
                 item = await self._queue.get()
                 match item:
-                    case Message():
-                        self._updates.append(item)
-                    case AgentRequest(sender=sender) as request, secrets:
+                    case AgentRequest(sender=sender) as request, secrets, end:
                         # -------------------------------------
                         #  TODO: trace query
                         # -------------------------------------
-                        async with self.agent.request_scope(secrets=secrets):
-                            async for elem in self.agent.run(request=request, updates=self._updates, stream=False):
-                                match elem:
-                                    case PermissionRequest():
-                                        # -------------------------------------
-                                        #  TODO: trace permission request
-                                        # -------------------------------------
-                                        await self.session.handle_permission_request(
-                                            request=elem, sender=self.agent.name, receiver=sender
-                                        )
-                                    case FeedbackRequest():
-                                        # -------------------------------------
-                                        #  TODO: trace feedback request
-                                        # -------------------------------------
-                                        await self.session.handle_feedback_request(
-                                            request=elem, sender=self.agent.name, receiver=sender
-                                        )
-                                    case AgentResponse():
-                                        # -------------------------------------
-                                        #  TODO: trace result
-                                        # -------------------------------------
-                                        await self.session.handle_agent_response(
-                                            response=elem, sender=self.agent.name, receiver=sender
-                                        )
-
-                            # agent now has notifications part of
-                            # its history, so we can clear it
-                            self._updates = []
+                        self._busy = True
+                        try:
+                            updates = self.pending_updates(end)
+                            stream = self.session.streaming
+                            async with self.agent.request_scope(secrets=secrets, username=sender):
+                                async for elem in self.agent.run(request=request, updates=updates, stream=stream):
+                                    match elem:
+                                        case PermissionRequest():
+                                            # -------------------------------------
+                                            #  TODO: trace permission request
+                                            # -------------------------------------
+                                            await self.session.handle_permission_request(
+                                                request=elem, sender=self.agent.name, receiver=sender
+                                            )
+                                        case FeedbackRequest():
+                                            # -------------------------------------
+                                            #  TODO: trace feedback request
+                                            # -------------------------------------
+                                            await self.session.handle_feedback_request(
+                                                request=elem, sender=self.agent.name, receiver=sender
+                                            )
+                                        case AgentResponse():
+                                            # -------------------------------------
+                                            #  TODO: trace result
+                                            # -------------------------------------
+                                            await self.session.handle_agent_response(
+                                                response=elem, sender=self.agent.name, receiver=sender
+                                            )
+
+                                # agent now has the updates part of
+                                # its history, so we can advance the cursor
+                                self._cursor = max(self._cursor, end)
+                                self.session._mark_dirty(self.key)
+                        finally:
+                            self._busy = False
 
 
 class Session:
@@ -112,8 +186,31 @@ class Session:
 
         self._agents: dict[str, SessionAgent] = {}
         self._messages: list[Message] = []
+        # Message id index and number of messages per sender,
+        # maintained for every message added to _messages.
+        self._message_index: dict[str, Message] = {}
+        self._sender_counts: Counter[str] = Counter()
         self._sync_task: Task | None = None
 
+        # Persisted states of agents that have not been loaded
+        # into this session yet (restored when they are added).
+        self._agent_states: dict[str, dict[str, Any]] = {}
+
+        # Number of currently executing worker coroutines and
+        # time of the last activity (used to detect idle sessions).
+        self._active = 0
+        self.last_activity = time.monotonic()
+
+        # Components changed since the last save ("messages", "selector"
+        # or "agent:<name>") and the lengths of their persisted lists.
+        self._dirty: set[str] = set()
+        self._saved: dict[str, int] = {}
+        self._journal_size = 0
+        self._save_lock = asyncio.Lock()
+        # selector history generation of the last save, the persisted
+        # selector history must be rewritten if it has been compacted
+        self._saved_selector_generation = 0
+
         self._gateway_queue: Queue = Queue()
         self._gateway_task: Task = create_task(self._gateway_worker())
         self._gateway: Gateway | None = None
@@ -124,10 +221,7 @@ class Session:
 
         self._selector_queue: Queue = Queue()
         self._selector_task: Task = create_task(self._selector_worker())
-        self._selector: AgentSelector = AgentSelector(
-            registry=self.agent_registry,
-            settings=self.selector_settings,
-        )
+        self._selector: AgentSelector = AgentSelector(self.manager.selector_engine)
 
     async def _gateway_worker(self):
         # for sequential (but not atomic) execution of gateway methods
@@ -138,16 +232,81 @@ class Session:
         await self._worker(self._request_handler_queue)
 
     async def _selector_worker(self):
-        # for sequential (but not atomic) execution of select()
-        await self._worker(self._selector_queue)
+        # for sequential (but not atomic) selection of agents for queued messages
+        while True:
+            messages = [await self._selector_queue.get()]
+            if self._selector.settings.backlog_policy == "latest":
+                while not self._selector_queue.empty():
+                    messages.append(self._selector_queue.get_nowait())
+
+            self._active += 1
+            try:
+                await self._select_backlog(messages)
+            finally:
+                self._active -= 1
+
+    async def _select_backlog(self, messages: list[Message]):
+        # selections for all but the latest message that requires one are
+        # superseded and not run by the selector model. Obvious non-requests
+        # don't require a selection and never supersede a request.
+        agent_names = await self.agent_names()
+        skipped = [self._selectable(message, agent_names) and self._selector.skip(message) for message in messages]
+        selectable = [
+            i for i, message in enumerate(messages) if self._selectable(message, agent_names) and not skipped[i]
+        ]
+
+        for i, message in enumerate(messages):
+            try:
+                await self.select(message, superseded=i in selectable[:-1], skipped=skipped[i])
+            except Exception as e:
+                logger.exception(e)
 
     async def _worker(self, queue: Queue):
         while True:
             coro = await queue.get()
+            self._active += 1
             try:
                 await coro
             except Exception as e:
                 logger.exception(e)
+            finally:
+                self._active -= 1
+
+    @property
+    def idle(self) -> bool:
+        """`True` if the session has no pending or running work."""
+        queues = [self._gateway_queue, self._request_handler_queue, self._selector_queue]
+        return (
+            self._active == 0
+            and all(queue.empty() for queue in queues)
+            and all(agent.idle for agent in self._agents.values())
+        )
+
+    def idle_time(self) -> float:
+        """Seconds since the last activity in this session."""
+        return time.monotonic() - self.last_activity
+
+    async def close(self):
+        """Stop the session's workers and agents and save pending changes.
+
+        A closed session can be restored with `SessionManager.load_session`.
+        """
+        if self._sync_task is not None:
+            # stop syncing without cancelling an in-flight save
+            async with self._save_lock:
+                self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+
+        tasks = [self._gateway_task, self._request_handler_task, self._selector_task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        for agent in self._agents.values():
+            await agent.close()
+
+        await self.save()
 
     @property
     def gateway(self) -> Gateway:
@@ -162,21 +321,56 @@ class Session:
     def set_gateway(self, gateway: Gateway):
         self._gateway = gateway
 
+    @property
+    def streaming(self) -> bool:
+        """Whether agents stream partial responses to the session's gateway."""
+        return self._gateway is not None and self._gateway.streaming
+
     def add_agent(self, agent: Agent):
-        self._agents[agent.name] = SessionAgent(agent, self)
+        session_agent = SessionAgent(agent, self)
+
+        if state := self._agent_states.pop(agent.name, None):
+            # restore the persisted state of this agent
+            session_agent.set_state(state)
+            self._saved[session_agent.key] = len(state["history"])
+        else:
+            # a new agent replaces any persisted state of an agent with the same name
+            self._saved.pop(session_agent.key, None)
+
+        self._agents[agent.name] = session_agent
+        self._mark_dirty(session_agent.key)
 
     async def load_agent(self, name: str):
         self.add_agent(await self.agent_registry.create_agent(name))
 
+    async def _reload_agent(self, name: str):
+        # rebuild an idle agent whose registered config has changed, keeping its state
+        session_agent = self._agents[name]
+        if session_agent.version == self.agent_registry.agent_version(name) or not session_agent.idle:
+            return
+        if name not in await self.agent_registry.get_registered_names():
+            return
+
+        version = self.agent_registry.agent_version(name)
+        agent = await self.agent_registry.create_agent(name)
+        if self._agents.get(name) is not session_agent or not session_agent.idle:
+            return
+
+        reloaded = SessionAgent(agent, self)
+        reloaded.version = version
+        reloaded._joined = session_agent._joined
+        reloaded.set_state(session_agent.get_state())
+        self._agents[name] = reloaded
+        await session_agent.close()
+
     async def agent_names(self) -> set[str]:
         names = set(self._agents.keys())
-        names |= await self.agent_registry.get_registered_names()
+        names |= await self.manager.registered_names()
         return names
 
     async def _num_agent_responses(self) -> int:
         agent_names = await self.agent_names()
-        agent_responses = [m for m in self._messages if m.sender in agent_names or m.sender == "system"]
-        return len(agent_responses)
+        return sum(self._sender_counts[name] for name in agent_names | {"system"})
 
     async def _load_referenced_threads(self, text: str) -> list[Thread]:
         refs = self.extract_thread_references(text)
@@ -211,6 +405,13 @@ class Session:
         await request.response()
 
     async def handle_agent_response(self, response: AgentResponse, sender: str, receiver: str):
+        if not response.final:
+            # partial responses are only delivered to the gateway,
+            # the final response is added to the session history
+            coro = self.gateway.handle_agent_response(response, sender, receiver, session_id=self.id)
+            await self._gateway_queue.put(coro)
+            return
+
         message = Message(sender=sender, receiver=receiver, text=response.text, handoffs=response.handoffs or None)
 
         # If an agent response contains thread references, we don't load the threads
@@ -233,13 +434,28 @@ class Session:
         )
         await self._gateway_queue.put(coro)
 
-    async def select(self, message: Message):
+    @staticmethod
+    def _selectable(message: Message, agent_names: set[str]) -> bool:
+        return message.sender != "system" and message.sender not in agent_names and message.receiver not in agent_names
+
+    async def select(self, message: Message, superseded: bool = False, skipped: bool | None = None):
         # agent names currently available in registry
         agent_names = await self.agent_names()
 
-        if message.sender == "system" or message.sender in agent_names or message.receiver in agent_names:
+        if not self._selectable(message, agent_names):
             # we don't select an agent, just add the message to the selector's history
             await self._selector.add(message)
+            self._mark_dirty("selector")
+            return
+
+        if skipped is None:
+            skipped = self._selector.skip(message)
+
+        if superseded or skipped:
+            # superseded by a later message or obvious non-request,
+            # added to the selector's history without running the model
+            await self._selector.add(message)
+            self._mark_dirty("selector")
             return
 
         if message.id:
@@ -250,6 +466,7 @@ class Session:
 
         selection_result = await self._selector.run(message)
         selection = selection_result.selection
+        self._mark_dirty("selector")
 
         if selection.agent_name in agent_names or selection.agent_name is None:
             confirmation_request = AgentSelectionConfirmationRequest(
@@ -266,6 +483,7 @@ class Session:
 
             # blocks until confirmation_request.respond() is called
             confirmation_response = await confirmation_request.response()
+            await self._selector.record(message, selection, confirmation_response)
 
             if not confirmation_response.confirmed or selection.agent_name is None or selection.query is None:
                 if message.id:
@@ -287,19 +505,19 @@ class Session:
 
         # Add message to this session's message history. These are
         # are the messages that users see on the platforms integrated
-        # by gateways.
-        self._messages.append(message)
+        # by gateways. Agents read their updates from this history.
+        self._add_message(message)
+        self._mark_dirty("messages")
+        self.last_activity = time.monotonic()
 
-        if self.group:
-            for agent_name, agent in self._agents.items():
-                if agent_name not in [message.sender, message.receiver]:
-                    await agent.update(message)
-
-        coro = self.select(message)
-        await self._selector_queue.put(coro)
+        await self._selector_queue.put(message)
 
     async def invoke(self, request: AgentRequest, receiver: str, selected: bool = False):
-        if receiver not in self._agents:
+        self.last_activity = time.monotonic()
+
+        if receiver in self._agents:
+            await self._reload_agent(receiver)
+        else:
             try:
                 await self.load_agent(receiver)
             except ValueError:
@@ -348,7 +566,13 @@ class Session:
             )
 
     def contains(self, id: str) -> bool:
-        return any(message.id == id for message in self._messages)
+        return id in self._message_index
+
+    def _add_message(self, message: Message):
+        self._messages.append(message)
+        self._sender_counts[message.sender] += 1
+        if message.id:
+            self._message_index[message.id] = message
 
     def sync(self, interval: float = 3.0):
         if self._sync_task is None:
@@ -356,32 +580,131 @@ class Session:
 
     async def _sync(self, interval: float):
         if not await self.manager.session_saved(self.id):
-            await self.save()
+            await self.save(snapshot=True)
         while True:
             await sleep(interval)
             await self.save()
 
-    async def save(self):
-        state_dict = {
-            "messages": [asdict(message) for message in self._messages],
-            "agents": {name: adapter.get_state() for name, adapter in self._agents.items()},
+    def _mark_dirty(self, component: str):
+        self._dirty.add(component)
+
+    async def save(self, snapshot: bool = False):
+        """Persist changes since the last save.
+
+        Changes are written as state delta to the session store. A full snapshot
+        is written if `snapshot` is `True` or if the number of deltas since the
+        last snapshot reached the manager's compaction threshold (only for stores
+        that need compaction). Nothing is written if the session has not changed.
+        """
+        async with self._save_lock:
+            if snapshot or (self._dirty and self._compaction_due()):
+                await self._save_snapshot()
+            elif self._dirty:
+                await self._save_delta()
+
+    def _compaction_due(self) -> bool:
+        return self.manager.store.compacts and self._journal_size >= self.manager.compaction_threshold
+
+    async def _save_snapshot(self):
+        self._dirty.clear()
+        state_dict: dict[str, Any] = {
+            "messages": [message_to_dict(message) for message in self._messages],
+            "agents": self._agent_states | {name: adapter.get_state() for name, adapter in self._agents.items()},
         }
         state_dict["selector"] = self._selector.get_state()
-        await self.manager.save_session_state(self.id, state_dict)
+        selector_generation = self._selector.generation
+        try:
+            await self.manager.save_session_state(self.id, state_dict)
+        except BaseException:
+            self._dirty |= {"messages", "selector"} | {agent.key for agent in self._agents.values()}
+            raise
+
+        self._saved = {
+            "messages": len(state_dict["messages"]),
+            "selector": len(state_dict["selector"]),
+        }
+        self._saved_selector_generation = selector_generation
+        for name, state in state_dict["agents"].items():
+            self._saved[f"agent:{name}"] = len(state["history"])
+        self._journal_size = 0
+
+    async def _save_delta(self):
+        # Lists in session state are append-only between snapshots, so only
+        # their new items are journaled, together with the offset at which
+        # they start. Replaying an entry truncates a list to the offset and
+        # appends the items, which makes replay idempotent.
+        dirty, self._dirty = self._dirty, set()
+        entry: dict[str, Any] = {}
+        saved: dict[str, int] = {}
+        selector_generation = self._saved_selector_generation
+
+        if "messages" in dirty:
+            offset = self._saved.get("messages", 0)
+            entry["messages"] = {
+                "offset": offset,
+                "items": [message_to_dict(message) for message in self._messages[offset:]],
+            }
+            saved["messages"] = len(self._messages)
+
+        if "selector" in dirty:
+            history = self._selector.get_state()
+            selector_generation = self._selector.generation
+            if selector_generation == self._saved_selector_generation:
+                offset = min(self._saved.get("selector", 0), len(history))
+            else:
+                offset = 0
+            entry["selector"] = {"offset": offset, "items": history[offset:]}
+            saved["selector"] = len(history)
+
+        for name, adapter in self._agents.items():
+            if adapter.key not in dirty:
+                continue
+            state = adapter.get_state()
+            offset = min(self._saved.get(adapter.key, 0), len(state["history"]))
+            entry.setdefault("agents", {})[name] = state | {
+                "history": {"offset": offset, "items": state["history"][offset:]},
+            }
+            saved[adapter.key] = len(state["history"])
+
+        try:
+            await self.manager.append_session_journal(self.id, entry)
+        except BaseException:
+            self._dirty |= dirty
+            raise
+
+        self._saved.update(saved)
+        self._saved_selector_generation = selector_generation
+        self._journal_size += 1
 
     async def load(self):
         state_dict = await self.manager.load_session_state(self.id)
 
-        # restore agent states
+        # Resolve thread references of all messages in one go. Threads are
+        # shared with other sessions through the manager's thread cache.
+        refs = thread_references(state_dict["messages"])
+        threads = {thread.session_id: thread for thread in await self.manager.load_threads(sorted(refs))}
+
+        # restore thread messages
+        self._messages = []
+        self._message_index = {}
+        self._sender_counts = Counter()
+        for message in state_dict["messages"]:
+            self._add_message(message_from_dict(message, threads))
+
+        # restore agent states, deferred for agents not loaded yet
         for name, state in state_dict["agents"].items():
             if name in self._agents:
                 self._agents[name].set_state(state)
+                self._saved[f"agent:{name}"] = len(state["history"])
+            else:
+                self._agent_states[name] = state
 
         # restore selector agent state
         self._selector.set_state(state_dict["selector"])
 
-        # restore thread messages
-        self._messages = [Message(**message) for message in state_dict["messages"]]
+        self._saved["messages"] = len(state_dict["messages"])
+        self._saved["selector"] = len(state_dict["selector"])
+        self._saved_selector_generation = self._selector.generation
 
 
 class SessionManager:
@@ -392,20 +715,48 @@ class SessionManager:
         permission_store: PermissionStore,
         request_handler: RequestHandler,
         selector_settings: AgentSelectorSettings | None = None,
-        root_dir: Path = Path(".data", "sessions"),
+        root_dir: Path | None = None,
+        compaction_threshold: int = 100,
+        store: SessionStore | None = None,
+        thread_cache_size: int = 100,
     ):
         self.agent_registry = agent_registry
         self.user_registry = user_registry
         self.permission_store = permission_store
         self.request_handler = request_handler
         self.selector_settings = selector_settings
+        self.compaction_threshold = compaction_threshold
+
+        # model, tools and instructions of agent selection, shared by all sessions
+        self.selector_engine = AgentSelectorEngine(registry=agent_registry, settings=selector_settings)
+
+        if store is not None and root_dir is not None:
+            raise ValueError("Either root_dir or store can be provided, not both")
 
-        self.root_dir = root_dir
-        self.root_dir.mkdir(parents=True, exist_ok=True)
+        # JSON files under root_dir, unless another store is provided
+        self.store = store or JsonSessionStore(root_dir or Path(".data", "sessions"))
+
+        # LRU cache of referenced threads, invalidated when a session is saved,
+        # and in-flight thread loads, shared by concurrent loads of a thread.
+        self.thread_cache_size = thread_cache_size
+        self._thread_cache: OrderedDict[str, Thread] = OrderedDict()
+        self._thread_loads: dict[str, Task] = {}
+
+        # registered agent names, with the registry version they were read at
+        self._registered_names: tuple[int, set[str]] | None = None
 
     def create_session(self, id: str | None = None) -> Session:
         return Session(manager=self, id=id)
 
+    async def registered_names(self) -> set[str]:
+        """Names of registered agents, re-read from the registry only after a registry change."""
+        version = self.agent_registry.version
+        if self._registered_names is None or self._registered_names[0] != version:
+            names = await self.agent_registry.get_registered_names()
+            # version may have been advanced by reading the registry
+            self._registered_names = self.agent_registry.version, names
+        return self._registered_names[1]
+
     async def load_session(self, id: str) -> Session | None:
         if not await self.session_saved(id):
             return None
@@ -413,30 +764,77 @@ class SessionManager:
         await session.load()
         return session
 
-    def session_path(self, id: str) -> Path:
-        return self.root_dir / f"{id}.json"
-
     async def session_saved(self, id: str) -> bool:
-        return await aiofiles.os.path.exists(str(self.session_path(id)))
+        return await self.store.exists(id)
 
     async def save_session_state(self, id: str, state: dict[str, Any]):
-        async with aiofiles.open(self.session_path(id), "w") as f:
-            await f.write(json.dumps(state, indent=2))
+        """Write a snapshot of the session state."""
+        self._invalidate_thread(id)
+        await self.store.save_state(id, state)
+
+    async def append_session_journal(self, id: str, entry: dict[str, Any]):
+        """Write session state changes since the last save."""
+        self._invalidate_thread(id)
+        await self.store.append_state(id, entry)
 
     async def load_session_state(self, id: str) -> dict[str, Any]:
-        async with aiofiles.open(self.session_path(id), "r") as f:
-            state_str = await f.read()
-        return json.loads(state_str)
+        return await self.store.load_state(id)
+
+    async def list_sessions(self) -> list[str]:
+        return await self.store.list_sessions()
+
+    async def delete_session(self, id: str):
+        self._invalidate_thread(id)
+        await self.store.delete(id)
 
     async def load_thread(self, id: str) -> Thread:
-        state = await self.load_session_state(id)
-        messages = [Message(**message) for message in state["messages"]]
-        return Thread(session_id=id, messages=messages)
+        if thread := self._thread_cache.get(id):
+            self._thread_cache.move_to_end(id)
+            return thread
+
+        if (task := self._thread_loads.get(id)) is None:
+            task = create_task(self._load_thread(id))
+            self._thread_loads[id] = task
+
+        # a cancelled caller must not cancel the load shared with others
+        return await asyncio.shield(task)
 
     async def load_threads(self, session_ids: list[str]) -> list[Thread]:
-        threads = []
-        for session_id in session_ids:
-            if not await self.session_saved(session_id):
-                continue
-            threads.append(await self.load_thread(session_id))
-        return threads
+        """Concurrently load the threads of saved sessions in `session_ids`,
+        skipping sessions that do not exist."""
+
+        async def load(session_id: str) -> Thread | None:
+            if session_id not in self._thread_cache and not await self.session_saved(session_id):
+                return None
+            return await self.load_thread(session_id)
+
+        threads = await asyncio.gather(*[load(session_id) for session_id in session_ids])
+        return [thread for thread in threads if thread is not None]
+
+    async def _load_thread(self, id: str) -> Thread:
+        try:
+            messages = await self.store.load_messages(id)
+        except BaseException:
+            self._remove_thread_load(id)
+            raise
+
+        # threads referenced by messages of a thread are not resolved
+        thread = Thread(session_id=id, messages=[message_from_dict(message, {}) for message in messages])
+
+        # cache the thread only if the session wasn't saved while loading
+        if self._remove_thread_load(id):
+            self._thread_cache[id] = thread
+            while len(self._thread_cache) > self.thread_cache_size:
+                self._thread_cache.popitem(last=False)
+
+        return thread
+
+    def _remove_thread_load(self, id: str) -> bool:
+        if self._thread_loads.get(id) is asyncio.current_task():
+            del self._thread_loads[id]
+            return True
+        return False
+
+    def _invalidate_thread(self, id: str):
+        self._thread_cache.pop(id, None)
+        self._thread_loads.pop(id, None)
@@ -0,0 +1,3 @@
+from hygroup.store.base import SessionStore, apply_state_delta
+from hygroup.store.file import JsonSessionStore
+from hygroup.store.sqlite import SqliteSessionStore
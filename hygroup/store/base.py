@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class SessionStore(ABC):
+    """Persistence of session state.
+
+    Session state is a dict with the following keys:
+
+    - `messages`: list of serialized session messages
+    - `agents`: dict of agent name to agent state (a `history` list and other fields, e.g. `cursor`)
+    - `selector`: list of serialized selector history messages
+
+    State is written either as full snapshot (`save_state`) or as delta
+    (`append_state`). A delta contains, for each changed list, the new items
+    and the offset at which they start (see `apply_state_delta`).
+
+    Stores with `compacts = True` accumulate deltas that are only folded into
+    state by a snapshot. Sessions therefore write a snapshot after a number of
+    deltas. Stores that apply deltas in place set `compacts = False`.
+    """
+
+    compacts: bool = True
+
+    @abstractmethod
+    async def exists(self, id: str) -> bool:
+        """Return `True` if state has been saved for session `id`."""
+
+    @abstractmethod
+    async def save_state(self, id: str, state: dict[str, Any]):
+        """Replace the state of session `id` with `state`."""
+
+    @abstractmethod
+    async def append_state(self, id: str, delta: dict[str, Any]):
+        """Apply `delta` to the state of session `id`."""
+
+    @abstractmethod
+    async def load_state(self, id: str) -> dict[str, Any]:
+        """Load the state of session `id`.
+
+        Raises:
+            FileNotFoundError: If no state has been saved for session `id`.
+        """
+
+    async def load_messages(self, id: str) -> list[dict[str, Any]]:
+        """Load only the messages of session `id`.
+
+        Stores should override this if they can read messages without agent
+        and selector state.
+
+        Raises:
+            FileNotFoundError: If no state has been saved for session `id`.
+        """
+        state = await self.load_state(id)
+        return state["messages"]
+
+    @abstractmethod
+    async def list_sessions(self) -> list[str]:
+        """Return the ids of all saved sessions."""
+
+    @abstractmethod
+    async def delete(self, id: str):
+        """Delete the state of session `id`."""
+
+    def close(self):
+        """Release resources held by the store."""
+
+
+def empty_state() -> dict[str, Any]:
+    return {"messages": [], "agents": {}, "selector": []}
+
+
+def apply_state_delta(state: dict[str, Any], delta: dict[str, Any]):
+    """Apply a state delta to `state` in-place.
+
+    Each list in `delta` truncates the corresponding list in `state` to its
+    `offset` and appends its `items`, which makes applying a delta idempotent.
+    """
+
+    def apply(items: list, list_delta: dict[str, Any]) -> list:
+        return items[: list_delta["offset"]] + list_delta["items"]
+
+    if "messages" in delta:
+        state["messages"] = apply(state["messages"], delta["messages"])
+
+    if "selector" in delta:
+        state["selector"] = apply(state["selector"], delta["selector"])
+
+    for name, agent_delta in delta.get("agents", {}).items():
+        agent_state = state["agents"].setdefault(name, {"history": []})
+        # fields other than history are replaced
+        agent_state.update({key: value for key, value in agent_delta.items() if key != "history"})
+        agent_state["history"] = apply(agent_state["history"], agent_delta["history"])
@@ -0,0 +1,153 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import aiofiles
+import aiofiles.os
+
+from hygroup.store.base import SessionStore, apply_state_delta, empty_state
+
+logger = logging.getLogger(__name__)
+
+MESSAGES_SUFFIX = ".messages.json"
+
+
+class JsonSessionStore(SessionStore):
+    """Stores the state of each session in JSON snapshot files and a JSON lines
+    journal file (`<id>.jsonl`) under `root_dir`.
+
+    A snapshot is split into a messages file (`<id>.messages.json`) and a file
+    with agent and selector state (`<id>.json`), so that messages can be loaded
+    without parsing agent histories. Deltas are appended to the journal. Saving
+    a snapshot compacts the journal.
+    """
+
+    def __init__(self, root_dir: Path | str = Path(".data", "sessions")):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+    def session_path(self, id: str) -> Path:
+        return self.root_dir / f"{id}.json"
+
+    def messages_path(self, id: str) -> Path:
+        return self.root_dir / f"{id}{MESSAGES_SUFFIX}"
+
+    def journal_path(self, id: str) -> Path:
+        return self.root_dir / f"{id}.jsonl"
+
+    async def exists(self, id: str) -> bool:
+        return await aiofiles.os.path.exists(str(self.session_path(id))) or await aiofiles.os.path.exists(
+            str(self.journal_path(id))
+        )
+
+    async def save_state(self, id: str, state: dict[str, Any]):
+        rest = {key: value for key, value in state.items() if key != "messages"}
+
+        await self._write(self.messages_path(id), state["messages"])
+        await self._write(self.session_path(id), rest)
+
+        # Journal entries are idempotent, so a crash before removing
+        # the journal doesn't corrupt state that is loaded later.
+        await self._remove(self.journal_path(id))
+
+    async def append_state(self, id: str, delta: dict[str, Any]):
+        async with aiofiles.open(self.journal_path(id), "a") as f:
+            await f.write(json.dumps(delta) + "\n")
+
+    async def load_state(self, id: str) -> dict[str, Any]:
+        session_path = self.session_path(id)
+        journal_path = self.journal_path(id)
+
+        session_exists = await aiofiles.os.path.exists(str(session_path))
+        journal_exists = await aiofiles.os.path.exists(str(journal_path))
+
+        if not session_exists and not journal_exists:
+            raise FileNotFoundError(f"Session {id} not found")
+
+        state = empty_state()
+
+        if session_exists:
+            state = await self._read(session_path)
+            if "messages" not in state:
+                state["messages"] = await self._read(self.messages_path(id))
+
+        for delta in await self._read_journal(id):
+            apply_state_delta(state, delta)
+
+        return state
+
+    async def load_messages(self, id: str) -> list[dict[str, Any]]:
+        session_exists = await aiofiles.os.path.exists(str(self.session_path(id)))
+        journal_exists = await aiofiles.os.path.exists(str(self.journal_path(id)))
+
+        if not session_exists and not journal_exists:
+            raise FileNotFoundError(f"Session {id} not found")
+
+        state = empty_state()
+
+        if session_exists:
+            state["messages"] = await self._read_snapshot_messages(id)
+
+        for delta in await self._read_journal(id):
+            if "messages" in delta:
+                apply_state_delta(state, {"messages": delta["messages"]})
+
+        return state["messages"]
+
+    async def list_sessions(self) -> list[str]:
+        ids = set()
+        for name in await aiofiles.os.listdir(str(self.root_dir)):
+            path = Path(name)
+            if name.endswith(MESSAGES_SUFFIX):
+                continue
+            if path.suffix in (".json", ".jsonl"):
+                ids.add(path.stem)
+        return sorted(ids)
+
+    async def delete(self, id: str):
+        await self._remove(self.session_path(id))
+        await self._remove(self.messages_path(id))
+        await self._remove(self.journal_path(id))
+
+    async def _read_snapshot_messages(self, id: str) -> list[dict[str, Any]]:
+        messages_path = self.messages_path(id)
+        if await aiofiles.os.path.exists(str(messages_path)):
+            return await self._read(messages_path)
+        # snapshot written before messages were split into a separate file
+        return (await self._read(self.session_path(id))).get("messages", [])
+
+    async def _read_journal(self, id: str) -> list[dict[str, Any]]:
+        journal_path = self.journal_path(id)
+        if not await aiofiles.os.path.exists(str(journal_path)):
+            return []
+
+        async with aiofiles.open(journal_path, "r") as f:
+            lines = (await f.read()).splitlines()
+
+        deltas = []
+        for line in lines:
+            try:
+                deltas.append(json.loads(line))
+            except json.JSONDecodeError:
+                # incomplete last entry, e.g. after a crash while appending
+                logger.warning(f"Skipping incomplete journal entry of session {id}")
+                break
+        return deltas
+
+    @staticmethod
+    async def _read(path: Path) -> Any:
+        async with aiofiles.open(path, "r") as f:
+            return json.loads(await f.read())
+
+    @staticmethod
+    async def _write(path: Path, data: Any):
+        tmp_path = path.with_name(path.name + ".tmp")
+        async with aiofiles.open(tmp_path, "w") as f:
+            await f.write(json.dumps(data, indent=2))
+        await aiofiles.os.replace(str(tmp_path), str(path))
+
+    @staticmethod
+    async def _remove(path: Path):
+        if await aiofiles.os.path.exists(str(path)):
+            await aiofiles.os.remove(str(path))
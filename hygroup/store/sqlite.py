@@ -0,0 +1,204 @@
+import asyncio
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+from hygroup.store.base import SessionStore, empty_state
+from hygroup.utils import arun
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+CREATE INDEX IF NOT EXISTS messages_message_id ON messages (session_id, message_id);
+CREATE TABLE IF NOT EXISTS agents (
+    session_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (session_id, name)
+);
+CREATE TABLE IF NOT EXISTS history (
+    session_id TEXT NOT NULL,
+    component TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, component, seq)
+);
+"""
+
+SELECTOR = "selector"
+AGENT_PREFIX = "agent:"
+
+
+class SqliteSessionStore(SessionStore):
+    """Stores session state in an SQLite database (in WAL mode).
+
+    Messages and history entries are stored as rows, indexed by session id and
+    sequence number (and message id for messages). Snapshots and deltas are each written in a single transaction.
+    Deltas only insert new rows, so there is no need for periodic snapshots.
+    """
+
+    compacts = False
+
+    def __init__(self, db_path: Path | str = Path(".data", "sessions.db")):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = asyncio.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    async def exists(self, id: str) -> bool:
+        async with self._lock:
+            return await arun(self._exists, id)
+
+    async def contains_message(self, id: str, message_id: str) -> bool:
+        """Return `True` if session `id` contains a message with id `message_id`."""
+        async with self._lock:
+            return await arun(self._contains_message, id, message_id)
+
+    async def save_state(self, id: str, state: dict[str, Any]):
+        async with self._lock:
+            await arun(self._save_state, id, state)
+
+    async def append_state(self, id: str, delta: dict[str, Any]):
+        async with self._lock:
+            await arun(self._append_state, id, delta)
+
+    async def load_state(self, id: str) -> dict[str, Any]:
+        async with self._lock:
+            return await arun(self._load_state, id)
+
+    async def load_messages(self, id: str) -> list[dict[str, Any]]:
+        async with self._lock:
+            return await arun(self._load_messages, id)
+
+    async def list_sessions(self) -> list[str]:
+        async with self._lock:
+            return await arun(self._list_sessions)
+
+    async def delete(self, id: str):
+        async with self._lock:
+            await arun(self._delete, id)
+
+    def _exists(self, id: str) -> bool:
+        row = self._conn.execute("SELECT 1 FROM sessions WHERE id = ?", (id,)).fetchone()
+        return row is not None
+
+    def _contains_message(self, id: str, message_id: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM messages WHERE session_id = ? AND message_id = ? LIMIT 1", (id, message_id)
+        ).fetchone()
+        return row is not None
+
+    def _save_state(self, id: str, state: dict[str, Any]):
+        with self._conn:
+            self._delete_rows(id)
+            self._touch(id)
+            self._write_messages(id, 0, state["messages"])
+            self._write_history(id, SELECTOR, 0, state["selector"])
+            for name, agent_state in state["agents"].items():
+                self._write_agent_fields(id, name, agent_state)
+                self._write_history(id, AGENT_PREFIX + name, 0, agent_state["history"])
+
+    def _append_state(self, id: str, delta: dict[str, Any]):
+        with self._conn:
+            self._touch(id)
+            if messages := delta.get("messages"):
+                self._write_messages(id, messages["offset"], messages["items"])
+            if selector := delta.get("selector"):
+                self._write_history(id, SELECTOR, selector["offset"], selector["items"])
+            for name, agent_delta in delta.get("agents", {}).items():
+                history = agent_delta["history"]
+                self._write_agent_fields(id, name, agent_delta)
+                self._write_history(id, AGENT_PREFIX + name, history["offset"], history["items"])
+
+    def _load_state(self, id: str) -> dict[str, Any]:
+        if not self._exists(id):
+            raise FileNotFoundError(f"Session {id} not found")
+
+        state = empty_state()
+        state["messages"] = self._read_messages(id)
+
+        for name, fields in self._conn.execute("SELECT name, fields FROM agents WHERE session_id = ?", (id,)):
+            state["agents"][name] = json.loads(fields) | {"history": []}
+
+        rows = self._conn.execute(
+            "SELECT component, data FROM history WHERE session_id = ? ORDER BY component, seq", (id,)
+        )
+        for component, data in rows:
+            if component == SELECTOR:
+                state["selector"].append(json.loads(data))
+            else:
+                name = component.removeprefix(AGENT_PREFIX)
+                agent_state = state["agents"].setdefault(name, {"history": []})
+                agent_state["history"].append(json.loads(data))
+
+        return state
+
+    def _load_messages(self, id: str) -> list[dict[str, Any]]:
+        if not self._exists(id):
+            raise FileNotFoundError(f"Session {id} not found")
+        return self._read_messages(id)
+
+    def _read_messages(self, id: str) -> list[dict[str, Any]]:
+        rows = self._conn.execute("SELECT data FROM messages WHERE session_id = ? ORDER BY seq", (id,))
+        return [json.loads(data) for (data,) in rows]
+
+    def _list_sessions(self) -> list[str]:
+        return [id for (id,) in self._conn.execute("SELECT id FROM sessions ORDER BY updated")]
+
+    def _delete(self, id: str):
+        with self._conn:
+            self._delete_rows(id)
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (id,))
+
+    def _delete_rows(self, id: str):
+        for table in ["messages", "agents", "history"]:
+            self._conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (id,))
+
+    def _touch(self, id: str):
+        self._conn.execute(
+            "INSERT INTO sessions (id, updated) VALUES (?, ?) ON CONFLICT (id) DO UPDATE SET updated = excluded.updated",
+            (id, time.time()),
+        )
+
+    def _write_messages(self, id: str, offset: int, items: list[dict[str, Any]]):
+        self._conn.execute("DELETE FROM messages WHERE session_id = ? AND seq >= ?", (id, offset))
+        self._conn.executemany(
+            "INSERT INTO messages (session_id, seq, message_id, data) VALUES (?, ?, ?, ?)",
+            [(id, offset + i, item.get("id"), json.dumps(item)) for i, item in enumerate(items)],
+        )
+
+    def _write_history(self, id: str, component: str, offset: int, items: list[Any]):
+        self._conn.execute(
+            "DELETE FROM history WHERE session_id = ? AND component = ? AND seq >= ?", (id, component, offset)
+        )
+        self._conn.executemany(
+            "INSERT INTO history (session_id, component, seq, data) VALUES (?, ?, ?, ?)",
+            [(id, component, offset + i, json.dumps(item)) for i, item in enumerate(items)],
+        )
+
+    def _write_agent_fields(self, id: str, name: str, agent_state: dict[str, Any]):
+        # agent state fields other than history, stored as JSON object
+        fields = {key: value for key, value in agent_state.items() if key != "history"}
+        self._conn.execute(
+            "INSERT INTO agents (session_id, name, fields) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id, name) DO UPDATE SET fields = excluded.fields",
+            (id, name, json.dumps(fields)),
+        )
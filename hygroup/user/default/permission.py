@@ -1,76 +1,111 @@
 import asyncio
+import logging
 from pathlib import Path
 
-from tinydb import Query, TinyDB
+from tinydb import TinyDB
 
 from hygroup.user.base import PermissionStore
 from hygroup.utils import arun
 
+logger = logging.getLogger(__name__)
+
 
 class DefaultPermissionStore(PermissionStore):
     """Database for tool execution permissions.
 
     Only session-scoped (level 2) and permanent (level 3) permissions are stored.
 
+    Permissions are loaded from `store_path` once and then served from an in-memory
+    index. Changes are written back to `store_path` in batches, at most `flush_delay`
+    seconds after they have been made, or when `flush` or `close` is called.
+
     **THIS IS A REFERENCE IMPLEMENTATION FOR EXPERIMENTATION, DO NOT USE IN PRODUCTION.**
     """
 
-    def __init__(self, store_path: Path | str = Path(".data", "users", "permissions.json")):
+    def __init__(self, store_path: Path | str = Path(".data", "users", "permissions.json"), flush_delay: float = 1.0):
         self.store_path = Path(store_path)
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_delay = flush_delay
 
         self._tinydb = TinyDB(str(self.store_path), indent=2)
         self._lock = asyncio.Lock()
 
+        # permissions by (tool_name, username) and session_id,
+        # permanent permissions are stored under session_id None
+        self._permissions: dict[tuple[str, str], dict[str | None, int]] = {}
+        for doc in self._tinydb.all():
+            key = doc["tool_name"], doc["username"]
+            self._permissions.setdefault(key, {})[doc["session_id"]] = doc["permission"]
+
+        self._dirty = False
+        self._flush_task: asyncio.Task | None = None
+
     async def get_permission(self, tool_name: str, username: str, session_id: str) -> int | None:
-        Query_ = Query()
+        permissions = self._permissions.get((tool_name, username))
+        if permissions is None:
+            return None
 
-        async with self._lock:
-            # First, check for permanent permission (level 3)
-            permanent_permission = await arun(
-                self._tinydb.get,
-                (Query_.tool_name == tool_name) & (Query_.username == username) & (Query_.session_id == None),  # noqa: E711
-            )
-            if permanent_permission:
-                return permanent_permission["permission"]
-
-            # Then check for session-specific permission (level 2)
-            session_permission = await arun(
-                self._tinydb.get,
-                (Query_.tool_name == tool_name) & (Query_.username == username) & (Query_.session_id == session_id),
-            )
-            if session_permission:
-                return session_permission["permission"]
-
-        # No stored permission found
-        return None
+        # First, check for permanent permission (level 3)
+        if (permanent_permission := permissions.get(None)) is not None:
+            return permanent_permission
+
+        # Then check for session-specific permission (level 2)
+        return permissions.get(session_id)
 
     async def set_permission(self, tool_name: str, username: str, session_id: str, permission: int):
         # Only persist levels 2 and 3
         if permission not in (2, 3):
             return
 
-        Query_ = Query()
+        key = tool_name, username
+
+        if permission == 3:
+            # Replace all existing permissions for this tool/user combination
+            self._permissions[key] = {None: permission}
+        elif permission == 2:
+            # Upsert based on tool/user/session combination
+            self._permissions.setdefault(key, {})[session_id] = permission
 
-        # Prepare the document
-        doc = {
-            "tool_name": tool_name,
-            "username": username,
-            "permission": permission,
-            "session_id": session_id if permission == 2 else None,
-        }
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
 
+    async def flush(self):
+        """Write pending permission changes to `store_path`."""
         async with self._lock:
-            # For level 3, remove any existing permissions (session or permanent) and insert new
-            if permission == 3:
-                # Remove all existing permissions for this tool/user combination
-                await arun(self._tinydb.remove, (Query_.tool_name == tool_name) & (Query_.username == username))
-                # Insert the permanent permission
-                await arun(self._tinydb.insert, doc)
-            elif permission == 2:
-                # For level 2, upsert based on tool/user/session combination
-                await arun(
-                    self._tinydb.upsert,
-                    doc,
-                    (Query_.tool_name == tool_name) & (Query_.username == username) & (Query_.session_id == session_id),
-                )
+            if not self._dirty:
+                return
+
+            self._dirty = False
+            docs = [
+                {"tool_name": tool_name, "username": username, "permission": permission, "session_id": session_id}
+                for (tool_name, username), permissions in self._permissions.items()
+                for session_id, permission in permissions.items()
+            ]
+            try:
+                await arun(self._write, docs)
+            except Exception:
+                self._dirty = True
+                raise
+
+    async def close(self):
+        """Write pending permission changes and stop the background writer."""
+        await self.flush()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+
+    async def _flush_later(self):
+        # changes made while writing are written by the next batch
+        while self._dirty:
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(e)
+
+    def _write(self, docs: list[dict]):
+        # replace all documents with a single write
+        table = self._tinydb.default_table_name
+        self._tinydb.storage.write({table: {str(doc_id): doc for doc_id, doc in enumerate(docs, start=1)}})
+        self._tinydb.clear_cache()
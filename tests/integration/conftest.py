@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+
+import pytest_asyncio
+
+from hygroup.agent import AgentSelectorSettings
+from hygroup.agent.default import DefaultAgentRegistry
+from hygroup.session import Session, SessionManager
+from hygroup.store import JsonSessionStore
+from hygroup.user import RequestHandler
+from hygroup.user.default import DefaultPermissionStore, DefaultUserRegistry
+
+
+class TrackingSessionManager(SessionManager):
+    """SessionManager that remembers created sessions so that tests can close them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sessions: list[Session] = []
+
+    def create_session(self, id: str | None = None) -> Session:
+        session = super().create_session(id)
+        self.sessions.append(session)
+        return session
+
+
+@pytest_asyncio.fixture
+async def manager(tmp_path):
+    """Provide a SessionManager that stores its data in a temporary directory."""
+    user_registry = DefaultUserRegistry(tmp_path / "users" / "registry.bin")
+    await user_registry.unlock("admin")
+    permission_store = DefaultPermissionStore(tmp_path / "users" / "permissions.json")
+
+    manager = TrackingSessionManager(
+        agent_registry=DefaultAgentRegistry(tmp_path / "agents" / "registry.json"),
+        user_registry=user_registry,
+        permission_store=permission_store,
+        request_handler=MagicMock(spec=RequestHandler),
+        selector_settings=AgentSelectorSettings(model="test"),
+        store=JsonSessionStore(tmp_path / "sessions"),
+        compaction_threshold=3,
+    )
+    yield manager
+
+    for session in manager.sessions:
+        await session.close()
+
+    await permission_store.close()
@@ -0,0 +1,29 @@
+import os
+
+from mcp.server.fastmcp import Context, FastMCP
+
+mcp = FastMCP("test")
+
+
+@mcp.tool()
+async def pid() -> int:
+    """Return the process id of this server."""
+    return os.getpid()
+
+
+@mcp.tool()
+async def secret() -> str:
+    """Return the value of the SECRET environment variable."""
+    return os.environ.get("SECRET", "")
+
+
+@mcp.tool()
+async def add_tool(name: str, ctx: Context) -> str:
+    """Add a tool with the given name and notify the client."""
+    mcp.add_tool(pid, name=name)
+    await ctx.session.send_tool_list_changed()
+    return name
+
+
+if __name__ == "__main__":
+    mcp.run()
@@ -0,0 +1,85 @@
+import pytest
+import pytest_asyncio
+from pydantic_ai.models.openai import OpenAIModel
+
+from hygroup.agent.default import AgentSettings, AgentTemplate, DefaultAgentRegistry, MCPSettings
+from tests.integration.example_tools import current_time, get_weather_forecast
+
+NUM_AGENTS = 10
+
+MODEL = {
+    "class": "pydantic_ai.models.openai.OpenAIModel",
+    "args": {
+        "model_name": "gpt-4o",
+        "provider": {
+            "class": "pydantic_ai.providers.openai.OpenAIProvider",
+            "args": {"api_key": "test-key"},
+        },
+    },
+}
+
+
+@pytest_asyncio.fixture
+async def registry(tmp_path) -> DefaultAgentRegistry:
+    registry = DefaultAgentRegistry(tmp_path / "registry.json")
+    settings = AgentSettings(
+        model=MODEL,
+        instructions="Weather assistant",
+        human_feedback=True,
+        mcp_settings=[MCPSettings(server_config={"command": "foo", "args": ["bar"]})],
+        tools=[current_time, get_weather_forecast],
+    )
+    await registry.add_config("weather", "Weather agent", settings)
+    return registry
+
+
+@pytest.fixture
+def compilations(monkeypatch) -> list[dict]:
+    """Records the config documents compiled into agent templates."""
+    compiled: list[dict] = []
+    from_config = AgentTemplate.from_config
+
+    def counting_from_config(doc: dict) -> AgentTemplate:
+        compiled.append(doc)
+        return from_config(doc)
+
+    monkeypatch.setattr(AgentTemplate, "from_config", staticmethod(counting_from_config))
+    return compiled
+
+
+@pytest.mark.asyncio
+async def test_template_is_compiled_once_per_config_version(registry: DefaultAgentRegistry, compilations: list[dict]):
+    for _ in range(NUM_AGENTS):
+        await registry.create_agent("weather")
+
+    assert len(compilations) == 1
+
+    await registry.update_config("weather", settings=AgentSettings(model="test", instructions="Updated"))
+
+    for _ in range(NUM_AGENTS):
+        await registry.create_agent("weather")
+
+    assert len(compilations) == 2
+
+
+@pytest.mark.asyncio
+async def test_agents_share_template(registry: DefaultAgentRegistry):
+    agent1 = await registry.create_agent("weather")
+    agent2 = await registry.create_agent("weather")
+
+    assert agent1.settings is agent2.settings
+    assert agent1.agent.model is agent2.agent.model
+    assert isinstance(agent1.agent.model, OpenAIModel)
+    assert isinstance(agent2.agent.model, OpenAIModel)
+    assert agent1.agent.model.client is agent2.agent.model.client
+    assert agent1.agent is not agent2.agent
+
+
+@pytest.mark.asyncio
+async def test_template_is_recompiled_after_update(registry: DefaultAgentRegistry):
+    agent1 = await registry.create_agent("weather")
+    await registry.update_config("weather", settings=AgentSettings(model="test", instructions="Updated"))
+    agent2 = await registry.create_agent("weather")
+
+    assert agent1.settings.instructions == "Weather assistant"
+    assert agent2.settings.instructions == "Updated"
@@ -576,3 +576,77 @@ async def test_update_config_emoji_field(registry: DefaultAgentRegistry, default
     # Verify emoji was changed
     emoji = await registry.get_emoji("emoji-test")
     assert emoji == "🚀"
+
+
+@pytest.mark.asyncio
+async def test_configs_are_served_from_index(
+    registry: DefaultAgentRegistry, default_settings: AgentSettings, monkeypatch
+):
+    """Test that lookups don't re-read the registry file."""
+    await registry.add_config(name="agent1", description="First agent", settings=default_settings, emoji="robot")
+
+    reads = 0
+    read_all = registry._tinydb.all
+
+    def counting_all():
+        nonlocal reads
+        reads += 1
+        return read_all()
+
+    monkeypatch.setattr(registry._tinydb, "all", counting_all)
+
+    for _ in range(10):
+        assert await registry.get_emoji("agent1") == "robot"
+        assert await registry.get_registered_names() == {"agent1"}
+        await registry.create_agent("agent1")
+
+    await registry.update_config(name="agent1", description="Updated agent")
+    await registry.add_config(name="agent2", description="Second agent", settings=default_settings)
+    await registry.remove_config("agent1")
+
+    assert await registry.get_descriptions() == {"agent2": "Second agent"}
+    assert reads == 0
+
+
+@pytest.mark.asyncio
+async def test_index_is_revalidated_after_external_edit(default_settings: AgentSettings, test_agents_dir: Path):
+    """Test that configs added by another registry instance are picked up."""
+    registry = DefaultAgentRegistry(test_agents_dir / "registry.json", revalidate=True)
+    assert await registry.get_registered_names() == set()
+
+    other = DefaultAgentRegistry(test_agents_dir / "registry.json")
+    await other.add_config(name="agent1", description="First agent", settings=default_settings)
+
+    assert await registry.get_registered_names() == {"agent1"}
+
+
+@pytest.mark.asyncio
+async def test_index_is_not_revalidated_by_default(default_settings: AgentSettings, test_agents_dir: Path):
+    """Test that external edits are ignored unless revalidation is enabled."""
+    registry = DefaultAgentRegistry(test_agents_dir / "registry.json")
+    assert await registry.get_registered_names() == set()
+
+    other = DefaultAgentRegistry(test_agents_dir / "registry.json")
+    await other.add_config(name="agent1", description="First agent", settings=default_settings)
+
+    assert await registry.get_registered_names() == set()
+
+
+@pytest.mark.asyncio
+async def test_returned_configs_are_copies(registry: DefaultAgentRegistry, default_settings: AgentSettings):
+    """Test that modifying returned configs doesn't modify the registry."""
+    await registry.add_config(name="agent1", description="First agent", settings=default_settings)
+
+    config = await registry.get_config("agent1")
+    assert config is not None
+    config["description"] = "Modified"
+    config["settings"]["instructions"] = "Modified"
+
+    configs = await registry.get_configs()
+    configs["agent1"]["emoji"] = "Modified"
+
+    config = await registry.get_config("agent1")
+    assert config is not None
+    assert config["description"] == "First agent"
+    assert config["settings"]["instructions"] == default_settings.instructions
+    assert config["emoji"] is None
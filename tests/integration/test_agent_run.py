@@ -0,0 +1,114 @@
+import asyncio
+from typing import AsyncIterator, Sequence
+
+import pytest
+
+from hygroup.agent import AgentRequest, AgentResponse, Message
+from hygroup.agent.default import AgentSettings, DefaultAgent
+
+POLL_INTERVAL = 0.1
+
+
+class FailingAgent(DefaultAgent):
+    async def _run(self, request: AgentRequest, updates: Sequence[Message], stream: bool):
+        raise ValueError("run failed")
+
+
+class SlowAgent(DefaultAgent):
+    cancelled = False
+
+    async def _run(self, request: AgentRequest, updates: Sequence[Message], stream: bool):
+        queue = self._ctx_queue.get()
+        await queue.put(AgentResponse(text="partial", final=False))
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+class ProgressAgent(DefaultAgent):
+    """Emits an intermediate response and continues after a few event loop iterations."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.log: list[str] = []
+
+    async def _run(self, request: AgentRequest, updates: Sequence[Message], stream: bool):
+        queue = self._ctx_queue.get()
+        await queue.put(AgentResponse(text="progress", final=False))
+        for _ in range(3):
+            await asyncio.sleep(0)
+        self.log.append("resumed")
+        await queue.put(AgentResponse(text="done", final=True))
+
+
+def create_agent(cls: type[DefaultAgent] = DefaultAgent) -> DefaultAgent:
+    return cls(name="agent1", settings=AgentSettings(model="test", instructions="You are a helpful assistant."))
+
+
+async def polling_run(agent: DefaultAgent, request: AgentRequest) -> AsyncIterator:
+    """Reference implementation of the previous polling loop."""
+    queue = asyncio.Queue()  # type: ignore
+    agent._ctx_queue.set(queue)
+    task = asyncio.create_task(agent._run(request=request, updates=(), stream=False))
+
+    while True:
+        if task.done() and task.exception():
+            raise task.exception()  # type: ignore
+        try:
+            obj = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+        else:
+            yield obj
+            if isinstance(obj, AgentResponse) and obj.final:
+                break
+
+
+async def delivery_order(agent: ProgressAgent, events: AsyncIterator) -> list[str]:
+    async for obj in events:
+        if isinstance(obj, AgentResponse) and not obj.final:
+            agent.log.append("delivered")
+    return agent.log
+
+
+@pytest.mark.asyncio
+async def test_event_delivered_before_run_continues():
+    request = AgentRequest(query="Hello", sender="user1")
+
+    # the consumer is woken up by the event itself ...
+    agent = create_agent(ProgressAgent)
+    assert isinstance(agent, ProgressAgent)
+    assert await delivery_order(agent, agent.run(request)) == ["delivered", "resumed"]
+
+    # ... whereas a polling consumer only sees it after the run moved on
+    agent = create_agent(ProgressAgent)
+    assert isinstance(agent, ProgressAgent)
+    assert await delivery_order(agent, polling_run(agent, request)) == ["resumed", "delivered"]
+
+
+@pytest.mark.asyncio
+async def test_run_exception_is_propagated():
+    agent = create_agent(FailingAgent)
+
+    async with asyncio.timeout(POLL_INTERVAL / 2):
+        with pytest.raises(ValueError, match="run failed"):
+            async for _ in agent.run(AgentRequest(query="Hello", sender="user1")):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_run_cancelled_when_consumer_stops():
+    agent = create_agent(SlowAgent)
+
+    events = agent.run(AgentRequest(query="Hello", sender="user1"))
+    async for response in events:
+        assert isinstance(response, AgentResponse)
+        assert response.text == "partial"
+        break
+    await events.aclose()  # type: ignore
+    await asyncio.sleep(0)
+
+    assert agent.cancelled  # type: ignore
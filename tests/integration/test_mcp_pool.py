@@ -0,0 +1,279 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from pydantic_ai.exceptions import UserError
+
+from hygroup.agent import AgentRequest, AgentResponse, PermissionRequest
+from hygroup.agent.default import AgentSettings, DefaultAgent, MCPSettings, mcp
+from hygroup.agent.default.mcp import (
+    MCPServerPool,
+    MCPServerPools,
+    ScopedMCPServer,
+    default_pools,
+)
+
+SERVER_SCRIPT = Path(__file__).parent / "mcp_server.py"
+
+
+def mcp_settings(session_scope: bool = True) -> MCPSettings:
+    return MCPSettings(
+        server_config={
+            "command": sys.executable,
+            "args": [str(SERVER_SCRIPT)],
+            "env": {"SECRET": "${SECRET}"},
+        },
+        session_scope=session_scope,
+    )
+
+
+def create_agent(name: str, settings: MCPSettings) -> DefaultAgent:
+    return DefaultAgent(
+        name=name,
+        settings=AgentSettings(model="test", instructions="You are a helpful assistant.", mcp_settings=[settings]),
+    )
+
+
+def scoped_server(agent: DefaultAgent) -> ScopedMCPServer:
+    server = agent.agent._mcp_servers[0]
+    assert isinstance(server, ScopedMCPServer)
+    return server
+
+
+@pytest_asyncio.fixture
+async def pools(monkeypatch):
+    monkeypatch.setenv("SECRET", "s0")
+    pools = default_pools()
+    yield pools
+    await pools.close()
+
+
+@pytest.fixture
+def pool(pools: MCPServerPools) -> MCPServerPool:
+    return pools.session
+
+
+@pytest.mark.asyncio
+async def test_session_scoped_servers_are_shared(pool: MCPServerPool):
+    agent1 = create_agent("agent1", mcp_settings())
+    agent2 = create_agent("agent2", mcp_settings())
+
+    async with agent1.session_scope(), agent2.session_scope():
+        server1 = scoped_server(agent1)
+        server2 = scoped_server(agent2)
+
+        assert server1.is_running
+        assert server1.leased is server2.leased
+        assert [tool.name for tool in await server2.list_tools()] == ["pid", "secret", "add_tool"]
+        assert await server1.leased.call_tool("secret", {}) == "s0"  # type: ignore
+
+    assert not server1.is_running
+    assert pool.stats.starts == 1
+    assert pool.stats.reuses == 1
+    # released server is kept running until reclaimed
+    assert len(pool) == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_servers_are_reclaimed(pool: MCPServerPool):
+    pool.idle_timeout = 0.1
+    agent = create_agent("agent1", mcp_settings())
+
+    async with agent.session_scope():
+        leased = scoped_server(agent).leased
+
+    await asyncio.sleep(0.3)
+    assert len(pool) == 0
+    assert pool.stats.reclaims == 1
+    assert leased is not None and not leased.is_running
+
+    async with agent.session_scope():
+        assert scoped_server(agent).leased is not leased
+
+    assert pool.stats.starts == 2
+
+
+@pytest.mark.asyncio
+async def test_released_server_is_reused_before_reclaim(pool: MCPServerPool):
+    agent = create_agent("agent1", mcp_settings())
+
+    async with agent.session_scope():
+        leased = scoped_server(agent).leased
+
+    async with agent.session_scope():
+        assert scoped_server(agent).leased is leased
+
+    assert pool.stats.starts == 1
+    assert pool.stats.reclaims == 0
+
+
+@pytest.mark.asyncio
+async def test_servers_with_different_config_are_not_shared(pool: MCPServerPool, monkeypatch):
+    agent1 = create_agent("agent1", mcp_settings())
+    async with agent1.session_scope():
+        monkeypatch.setenv("SECRET", "s1")
+        agent2 = create_agent("agent2", mcp_settings())
+        async with agent2.session_scope():
+            assert scoped_server(agent1).leased is not scoped_server(agent2).leased
+            assert await scoped_server(agent2).leased.call_tool("secret", {}) == "s1"  # type: ignore
+
+    assert pool.stats.starts == 2
+
+
+@pytest.mark.asyncio
+async def test_request_scoped_servers_are_kept_warm_per_user(pools: MCPServerPools):
+    agent = create_agent("agent1", mcp_settings(session_scope=False))
+    server = scoped_server(agent)
+
+    async with agent.request_scope(secrets={"secret": "s1"}, username="u1"):
+        leased1 = server.leased
+        assert await leased1.call_tool("secret", {}) == "s1"  # type: ignore
+
+    async with agent.request_scope(secrets={"secret": "s1"}, username="u1"):
+        assert server.leased is leased1
+
+    # same secrets, different user
+    async with agent.request_scope(secrets={"secret": "s1"}, username="u2"):
+        assert server.leased is not leased1
+
+    # same user, different resolved config
+    async with agent.request_scope(secrets={"secret": "s2"}, username="u1"):
+        assert server.leased is not leased1
+        assert await server.leased.call_tool("secret", {}) == "s2"  # type: ignore
+
+    assert pools.request.stats.starts == 3
+    assert pools.request.stats.reuses == 1
+    assert len(pools.session) == 0
+
+
+@pytest.mark.asyncio
+async def test_request_scoped_servers_are_not_shared_across_users():
+    settings = mcp_settings(session_scope=False).resolve({})
+    pool = MCPServerPool()
+
+    # same resolved config (no secret substituted) but different users
+    async with pool.lease(settings, owner="u1") as leased1, pool.lease(settings, owner="u2") as leased2:
+        assert leased1 is not leased2
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_servers_are_evicted_when_pool_is_full():
+    pool = MCPServerPool(max_size=1)
+
+    async with pool.lease(mcp_settings().resolve({"secret": "u1"})) as leased1:
+        pass
+
+    async with pool.lease(mcp_settings().resolve({"secret": "u2"})) as leased2:
+        assert pool.stats.evictions == 1
+        await asyncio.sleep(0.1)
+        assert not leased1.is_running
+
+        # no idle server left to evict
+        async with pool.lease(mcp_settings().resolve({"secret": "u3"})) as leased3:
+            assert pool.stats.overflows == 1
+            assert await leased3.call_tool("secret", {}) == "u3"
+
+        assert not leased3.is_running
+        assert leased2.is_running
+        assert len(pool) == 1
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_scoped_server_entered_directly(pools: MCPServerPools):
+    agent = create_agent("agent1", mcp_settings())
+    server = scoped_server(agent)
+
+    with pytest.raises(UserError):
+        async with server:
+            pass
+
+    async with agent.session_scope():
+        # opens a dedicated connection with the settings of the leased server
+        async with server:
+            result = await server._client.call_tool("secret", {})
+            assert result.content[0].text == "s0"  # type: ignore
+
+
+async def run_as_user(agent: DefaultAgent, secret: str, barrier: asyncio.Barrier) -> str:
+    async with agent.request_scope(secrets={"secret": secret}, username=secret):
+        # both requests are in their request scope at the same time
+        await barrier.wait()
+        async for elem in agent.run(AgentRequest(query="Hello", sender=secret)):
+            match elem:
+                case PermissionRequest():
+                    assert elem.as_user
+                    elem.grant_once()
+                case AgentResponse(final=True):
+                    return elem.text
+    raise AssertionError("no final response")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_use_their_own_secrets(pools: MCPServerPools):
+    agent = create_agent("agent1", mcp_settings(session_scope=False))
+    secrets = [f"u{i}" for i in range(4)]
+    barrier = asyncio.Barrier(len(secrets))
+
+    results = await asyncio.gather(*[run_as_user(agent, secret, barrier) for secret in secrets])
+
+    # the test model calls all tools and responds with their results
+    for secret, result in zip(secrets, results):
+        assert json.loads(result)["secret"] == secret
+
+    assert pools.request.stats.starts == len(secrets)
+    assert not scoped_server(agent).is_running
+
+
+@pytest.mark.asyncio
+async def test_tool_listings_are_cached():
+    pool = MCPServerPool()
+
+    async with pool.lease(mcp_settings().resolve({})) as leased:
+        tools = await leased.list_tools()
+        assert await leased.list_tools() == tools
+        assert leased.tool_stats.misses == 1
+        assert leased.tool_stats.hits == 1
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_tool_listings_expire():
+    pool = MCPServerPool(tools_ttl=0.0)
+
+    async with pool.lease(mcp_settings().resolve({})) as leased:
+        await leased.list_tools()
+        await leased.list_tools()
+        assert leased.tool_stats.misses == 2
+        assert leased.tool_stats.hits == 0
+
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_changed_tool_listings_are_seen_after_ttl(monkeypatch):
+    pool = MCPServerPool(tools_ttl=60.0)
+
+    async with pool.lease(mcp_settings().resolve({})) as leased:
+        await leased.list_tools()
+        await leased.call_tool("add_tool", {"name": "new_tool"})
+
+        # cached listing is served until it expires
+        assert "new_tool" not in [tool.name for tool in await leased.list_tools()]
+
+        now = time.monotonic()
+        monkeypatch.setattr(mcp, "time", SimpleNamespace(monotonic=lambda: now + 60.0))
+        assert "new_tool" in [tool.name for tool in await leased.list_tools()]
+        assert leased.tool_stats.misses == 2
+        assert leased.tool_stats.hits == 1
+
+    await pool.close()
@@ -1,3 +1,4 @@
+import asyncio
 import shutil
 import tempfile
 from pathlib import Path
@@ -14,6 +15,7 @@ async def store():
     temp_dir = tempfile.mkdtemp()
     store = DefaultPermissionStore(Path(temp_dir) / "test_permissions.json")
     yield store
+    await store.close()
     # Cleanup
     shutil.rmtree(temp_dir)
 
@@ -170,6 +172,7 @@ async def test_persistence_across_instances(store):
     # Set some permissions
     await store.set_permission("bash", "alice", "session123", 2)
     await store.set_permission("python", "bob", "session456", 3)
+    await store.flush()
 
     # Create new store instance with same path
     store2 = DefaultPermissionStore(store.store_path)
@@ -186,6 +189,7 @@ async def test_persistence_across_instances(store):
 async def test_session_id_none_for_permanent(store):
     """Test that permanent permissions have session_id as None in storage."""
     await store.set_permission("bash", "alice", "session123", 3)
+    await store.flush()
 
     # Check internal storage (this is a white-box test)
     from tinydb import Query
@@ -209,6 +213,7 @@ async def test_permanent_permission_removes_all_existing(store):
 
     # Set permanent permission
     await store.set_permission("bash", "alice", "ignored_session", 3)
+    await store.flush()
 
     # Check that all documents for this tool/user are removed except the permanent one
     from tinydb import Query
@@ -242,3 +247,38 @@ async def test_edge_cases(store):
     await store.set_permission("tool@#$%", "user!@#", "sess^&*()", 3)
     result = await store.get_permission("tool@#$%", "user!@#", "any_session")
     assert result == 3
+
+
+@pytest.mark.asyncio
+async def test_changes_are_written_in_batches(store, monkeypatch):
+    """Test that permission changes are written back after the flush delay in a single write."""
+    store.flush_delay = 0.05
+    writes = 0
+    write = store._write
+
+    def counting_write(docs):
+        nonlocal writes
+        writes += 1
+        write(docs)
+
+    monkeypatch.setattr(store, "_write", counting_write)
+
+    for i in range(10):
+        await store.set_permission("bash", "alice", f"session{i}", 2)
+    assert writes == 0
+
+    await asyncio.sleep(0.2)
+    assert writes == 1
+
+    store2 = DefaultPermissionStore(store.store_path)
+    assert await store2.get_permission("bash", "alice", "session9") == 2
+
+
+@pytest.mark.asyncio
+async def test_pending_changes_are_written_on_close(store):
+    """Test that closing the store writes pending changes."""
+    await store.set_permission("bash", "alice", "session123", 3)
+    await store.close()
+
+    store2 = DefaultPermissionStore(store.store_path)
+    assert await store2.get_permission("bash", "alice", "any_session") == 3
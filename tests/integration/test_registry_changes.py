@@ -0,0 +1,135 @@
+import asyncio
+from typing import Any, AsyncIterator, Sequence
+
+import pytest
+
+from hygroup.agent import Agent, AgentRegistryChange, AgentRequest, AgentResponse, Message
+from hygroup.agent.default import AgentSettings, DefaultAgentRegistry
+from hygroup.session import SessionManager
+
+
+class EchoAgent(Agent):
+    def __init__(self, name: str, prefix: str):
+        super().__init__(name)
+        self.prefix = prefix
+        self.history: list[str] = []
+
+    async def run(
+        self, request: AgentRequest, updates: Sequence[Message] = (), stream: bool = False
+    ) -> AsyncIterator[AgentResponse]:
+        self.history.append(request.query)
+        yield AgentResponse(text=f"{self.prefix}{request.query}", final=True)
+
+    def get_state(self) -> Any:
+        return list(self.history)
+
+    def set_state(self, state: Any):
+        self.history = list(state)
+
+
+async def wait_until(condition, timeout: float = 1.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_changes_are_published(tmp_path):
+    registry = DefaultAgentRegistry(tmp_path / "registry.json")
+    settings = AgentSettings(model="test", instructions="")
+    changes = registry.subscribe()
+
+    await registry.add_config("a1", "Agent 1", settings)
+    await registry.add_config("a2", "Agent 2", settings)
+    await registry.update_config("a1", description="Agent 1 updated")
+    await registry.remove_config("a2")
+    registry.unsubscribe(changes)
+    await registry.remove_config("a1")
+
+    assert [changes.get_nowait() for _ in range(changes.qsize())] == [
+        AgentRegistryChange(version=1, added={"a1"}),
+        AgentRegistryChange(version=2, added={"a2"}),
+        AgentRegistryChange(version=3, updated={"a1"}),
+        AgentRegistryChange(version=4, removed={"a2"}),
+    ]
+    assert registry.version == 5
+    assert registry.agent_version("a1") == 5
+    assert registry.agent_version("a2") == 4
+
+
+@pytest.mark.asyncio
+async def test_oldest_changes_are_dropped_when_queue_is_full(tmp_path):
+    registry = DefaultAgentRegistry(tmp_path / "registry.json")
+    settings = AgentSettings(model="test", instructions="")
+    changes = registry.subscribe(maxsize=2)
+
+    for i in range(4):
+        await registry.add_config(f"a{i}", f"Agent {i}", settings)
+
+    assert [changes.get_nowait().version for _ in range(changes.qsize())] == [3, 4]
+    registry.unsubscribe(changes)
+
+
+@pytest.mark.asyncio
+async def test_external_edits_are_published(tmp_path):
+    settings = AgentSettings(model="test", instructions="")
+    registry = DefaultAgentRegistry(tmp_path / "registry.json", revalidate=True)
+    await registry.add_config("a1", "Agent 1", settings)
+    changes = registry.subscribe()
+
+    other = DefaultAgentRegistry(tmp_path / "registry.json")
+    await other.update_config("a1", description="Agent 1 updated")
+    await other.add_config("a2", "Agent 2", settings)
+
+    # modification is counted before the index is reloaded
+    assert registry.version == 2
+    assert changes.empty()
+
+    assert await registry.get_registered_names() == {"a1", "a2"}
+    assert registry.version == 2
+    assert changes.get_nowait() == AgentRegistryChange(version=2, added={"a2"}, updated={"a1"})
+
+
+@pytest.mark.asyncio
+async def test_session_agent_names_are_cached(manager: SessionManager, monkeypatch):
+    registry = manager.agent_registry
+    registry.add_factory("a1", "Agent 1", lambda: EchoAgent("a1", ""))  # type: ignore
+
+    reads = 0
+    get_registered_names = registry.get_registered_names
+
+    async def counting_get_registered_names():
+        nonlocal reads
+        reads += 1
+        return await get_registered_names()
+
+    monkeypatch.setattr(registry, "get_registered_names", counting_get_registered_names)
+
+    session = manager.create_session("s1")
+    for _ in range(5):
+        assert await session.agent_names() == {"a1"}
+    assert reads == 1
+
+    registry.add_factory("a2", "Agent 2", lambda: EchoAgent("a2", ""))  # type: ignore
+    assert await session.agent_names() == {"a1", "a2"}
+    assert reads == 2
+
+
+@pytest.mark.asyncio
+async def test_session_agent_is_rebuilt_after_config_change(manager: SessionManager):
+    registry = manager.agent_registry
+    registry.add_factory("a1", "Agent 1", lambda: EchoAgent("a1", "v1:"))  # type: ignore
+
+    session = manager.create_session("s1")
+    await session.invoke(AgentRequest(query="q1", sender="user1"), receiver="a1")
+    await wait_until(lambda: session.idle)
+
+    registry.add_factory("a1", "Agent 1", lambda: EchoAgent("a1", "v2:"))  # type: ignore
+    await session.invoke(AgentRequest(query="q2", sender="user1"), receiver="a1")
+    await wait_until(lambda: session.idle)
+
+    assert [m.text for m in session.messages if m.sender == "a1"] == ["v1:q1", "v2:q2"]
+    # history of the replaced agent is kept
+    agent = session._agents["a1"].agent
+    assert isinstance(agent, EchoAgent)
+    assert agent.history == ["q1", "q2"]
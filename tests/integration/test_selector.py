@@ -0,0 +1,292 @@
+import asyncio
+import json
+import os
+from unittest.mock import AsyncMock
+
+import aiofiles
+import pytest
+from pydantic_ai.messages import ModelRequest, ModelResponse, ToolCallPart, ToolReturnPart
+
+from hygroup.agent import (
+    AgentSelection,
+    AgentSelectionResult,
+    AgentSelector,
+    AgentSelectorEngine,
+    AgentSelectorSettings,
+    Message,
+    RulePreSelector,
+)
+from hygroup.agent.select import SelectionDecision, SelectionLog, train_router
+from hygroup.gateway.slack.app_home.policy.handlers import ActivationPolicyConfigHandlers
+from hygroup.session import Session, SessionManager
+from hygroup.user import RequestHandler
+
+
+class RejectingRequestHandler(RequestHandler):
+    async def handle_permission_request(self, request, sender: str, receiver: str, session_id: str):
+        request.deny()
+
+    async def handle_feedback_request(self, request, sender: str, receiver: str, session_id: str):
+        request.respond("")
+
+    async def handle_confirmation_request(self, request, sender: str, receiver: str, session_id: str):
+        request.respond(confirmed=False, comment="not needed")
+
+
+async def wait_until(condition, timeout: float = 1.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_pre_selector_skips_selector_model(manager: SessionManager):
+    pre_selector = RulePreSelector()
+    manager.selector_engine.settings.pre_selector = pre_selector
+
+    session = manager.create_session("s1")
+    session._selector.run = AsyncMock()  # type: ignore
+
+    await session.update(Message(sender="user1", receiver=None, text="thanks!"))
+    await wait_until(lambda: session.idle)
+
+    session._selector.run.assert_not_awaited()
+    # skipped message is still added to the selector's history
+    assert "thanks!" in str(session._selector.get_state())
+
+    await session.update(Message(sender="user1", receiver=None, text="What is the weather in Vienna tomorrow?"))
+    await wait_until(lambda: session._selector.run.await_count == 1)
+
+    assert pre_selector.stats.messages == 2
+    assert pre_selector.stats.skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_router_selection_skips_selector_model(manager: SessionManager):
+    decisions = [SelectionDecision(f"weather in {city}", "weather", True) for city in ["vienna", "paris", "rome"]]
+    decisions += [SelectionDecision(f"lunch in {city}", None, True) for city in ["vienna", "paris", "rome"]]
+
+    session = manager.create_session("s1")
+    session._selector.settings.router = train_router(decisions, dim=2**10)
+    session._selector.settings.router_threshold = 0.8
+    session._selector.engine._agent.run = AsyncMock()  # type: ignore
+
+    result = await session._selector.run(Message(sender="user1", receiver=None, text="weather in oslo"))
+
+    session._selector.engine._agent.run.assert_not_awaited()
+    assert result.selection == AgentSelection(agent_name="weather", query="weather in oslo")
+    # routed selection is added to the selector's history
+    assert "weather in oslo" in str(session._selector.get_state())
+
+
+@pytest.mark.asyncio
+async def test_selection_decisions_are_logged(manager: SessionManager, tmp_path):
+    session = manager.create_session("s1")
+    session._selector.settings.decisions_file = tmp_path / "selections.jsonl"
+    session._selector.run = AsyncMock(  # type: ignore
+        return_value=AgentSelectionResult(selection=AgentSelection(agent_name=None, query=None))
+    )
+    session._request_handler = RejectingRequestHandler()
+
+    await session.update(Message(sender="user1", receiver=None, text="What is the weather in Vienna tomorrow?"))
+    await wait_until(lambda: session.idle)
+
+    assert SelectionLog(tmp_path / "selections.jsonl").read() == [
+        SelectionDecision(
+            text="What is the weather in Vienna tomorrow?", agent_name=None, confirmed=False, comment="not needed"
+        )
+    ]
+
+
+async def select_backlog(
+    manager: SessionManager, backlog_policy: str, backlog: list[str] | None = None
+) -> tuple[Session, list[str], list[str]]:
+    session = manager.create_session("s1")
+    session._selector.settings.backlog_policy = backlog_policy  # type: ignore
+    session._request_handler = RejectingRequestHandler()
+
+    selected: list[str] = []
+    release = asyncio.Event()
+
+    async def run(message: Message):
+        selected.append(message.text)
+        await release.wait()
+        return AgentSelectionResult(selection=AgentSelection(agent_name=None, query=None))
+
+    session._selector.run = run  # type: ignore
+
+    texts = ["What is the weather in city 0?"]
+    texts += backlog if backlog is not None else [f"What is the weather in city {i}?" for i in range(1, 4)]
+    await session.update(Message(sender="user1", receiver=None, text=texts[0]))
+    await wait_until(lambda: len(selected) == 1)
+
+    # queued while the first selection is running
+    for text in texts[1:]:
+        await session.update(Message(sender="user1", receiver=None, text=text))
+    release.set()
+    await wait_until(lambda: session.idle)
+    return session, texts, selected
+
+
+@pytest.mark.asyncio
+async def test_backlogged_selections_are_superseded(manager: SessionManager):
+    session, texts, selected = await select_backlog(manager, "latest")
+
+    assert selected == [texts[0], texts[-1]]
+    # superseded messages are still added to the selector's history
+    state = str(session._selector.get_state())
+    assert all(text in state for text in texts[1:-1])
+
+
+@pytest.mark.asyncio
+async def test_backlogged_non_requests_do_not_supersede(manager: SessionManager):
+    manager.selector_engine.settings.pre_selector = RulePreSelector()
+    _, texts, selected = await select_backlog(manager, "latest", ["What is the weather in Rome?", "thanks!"])
+
+    assert selected == [texts[0], "What is the weather in Rome?"]
+
+
+@pytest.mark.asyncio
+async def test_backlogged_selections_run_sequentially(manager: SessionManager):
+    _, texts, selected = await select_backlog(manager, "all")
+    assert selected == texts
+
+
+def assert_tool_calls_paired(selector: AgentSelector):
+    call_ids: set[str] = set()
+    for msg in selector._history:
+        for part in msg.parts:
+            if isinstance(msg, ModelResponse) and isinstance(part, ToolCallPart):
+                call_ids.add(part.tool_call_id)
+            elif isinstance(msg, ModelRequest) and isinstance(part, ToolReturnPart):
+                assert part.tool_call_id in call_ids
+
+
+@pytest.mark.asyncio
+async def test_selector_history_is_bounded(manager: SessionManager):
+    history_turns = 10
+    settings = AgentSelectorSettings(model="test", history_turns=history_turns, summary_size=200)
+    selector = AgentSelector(AgentSelectorEngine(registry=manager.agent_registry, settings=settings))
+
+    sizes = []
+    for i in range(300):
+        await selector.add(Message(sender="system", receiver=None, text=f"message {i:03d}"))
+        sizes.append(len(json.dumps(selector.get_state())))
+
+    turns = [
+        msg for msg in selector._history if isinstance(msg, ModelRequest) and msg.parts[0].part_kind == "user-prompt"
+    ]
+    assert len(turns) <= history_turns
+    assert max(sizes[200:]) <= max(sizes[:100])
+    # agents info is kept when the turn it was added with is collapsed
+    assert len(agents_infos(selector)) == 1
+    assert selector.generation > 0
+
+    # most recent collapsed messages are kept in the summary
+    summary = turns[0].parts[0].content
+    assert len(summary) <= len("Summary of earlier messages:\n") + settings.summary_size
+    assert "message 29" in summary
+    assert "message 000" not in summary
+    assert_tool_calls_paired(selector)
+
+    result = await selector.run(Message(sender="user1", receiver=None, text="What is the weather in Vienna?"))
+    assert result.selection is not None
+    assert_tool_calls_paired(selector)
+
+
+@pytest.mark.asyncio
+async def test_compacted_selector_history_is_persisted(manager: SessionManager):
+    manager.selector_settings.history_turns = 4  # type: ignore
+    # compacted history is saved with journal entries only
+    manager.compaction_threshold = 100
+
+    session = manager.create_session("s1")
+    for i in range(10):
+        await session.update(Message(sender="system", receiver=None, text=f"message {i}"))
+        await wait_until(lambda: session.idle)
+        await session.save()
+
+    assert session._selector.generation > 0
+
+    loaded = await manager.load_session("s1")
+    assert loaded is not None
+    assert loaded._selector.get_state() == session._selector.get_state()
+
+
+class CountingOpen:
+    def __init__(self, monkeypatch):
+        self.count = 0
+        self._open = aiofiles.open
+        monkeypatch.setattr(aiofiles, "open", self)
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+        return self._open(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_instructions_are_cached(manager: SessionManager, tmp_path, monkeypatch):
+    path = tmp_path / "policy.md"
+    path.write_text("policy 1")
+
+    settings = AgentSelectorSettings(model="test", instructions_file=path)
+    engine = AgentSelectorEngine(registry=manager.agent_registry, settings=settings)
+    reads = CountingOpen(monkeypatch)
+
+    for _ in range(3):
+        assert await engine.instructions() == "policy 1"
+    assert reads.count == 1
+
+    path.write_text("policy 22")
+    assert await engine.instructions() == "policy 22"
+    assert reads.count == 2
+
+    path.unlink()
+    assert await engine.instructions() == settings.instructions
+
+
+@pytest.mark.asyncio
+async def test_instructions_are_reloaded_when_policy_is_edited(manager: SessionManager, tmp_path):
+    path = tmp_path / "policy.md"
+    path.write_text("policy 1")
+    stat = path.stat()
+
+    settings = AgentSelectorSettings(model="test", instructions_file=path)
+    engine = AgentSelectorEngine(registry=manager.agent_registry, settings=settings)
+    assert await engine.instructions() == "policy 1"
+
+    handlers = ActivationPolicyConfigHandlers(AsyncMock(), settings, engine)
+    await handlers._set_custom_policy("policy 2")
+    # same size and modification time as before the edit
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert await engine.instructions() == "policy 2"
+
+
+def agents_infos(selector: AgentSelector) -> list[str]:
+    return [
+        part.content
+        for msg in selector._history
+        for part in msg.parts
+        if isinstance(part, ToolReturnPart) and part.tool_name == "get_registered_agents"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_agents_info_is_updated_after_registry_change(manager: SessionManager):
+    registry = manager.agent_registry
+    selector = AgentSelector(manager.selector_engine)
+
+    registry.add_factory("a1", "Agent 1", AsyncMock)  # type: ignore
+    await selector.add(Message(sender="system", receiver=None, text="m1"))
+    await selector.add(Message(sender="system", receiver=None, text="m2"))
+    assert agents_infos(selector) == ["- a1: Agent 1"]
+
+    registry.add_factory("a2", "Agent 2", AsyncMock)  # type: ignore
+    await selector.add(Message(sender="system", receiver=None, text="m3"))
+    assert agents_infos(selector) == ["- a1: Agent 1", "- a1: Agent 1\n- a2: Agent 2"]
+
+    # change that doesn't affect the agents info
+    registry.add_factory("a2", "Agent 2", AsyncMock)  # type: ignore
+    await selector.add(Message(sender="system", receiver=None, text="m4"))
+    assert len(agents_infos(selector)) == 2
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Sequence
+
+import pytest
+
+from hygroup.agent import Agent, AgentRequest, AgentResponse, Message
+from hygroup.gateway.cache import SessionCache
+from hygroup.session import Session, SessionManager
+
+
+class EchoAgent(Agent):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.history: list[str] = []
+
+    async def run(
+        self, request: AgentRequest, updates: Sequence[Message] = (), stream: bool = False
+    ) -> AsyncIterator[AgentResponse]:
+        self.history.append(request.query)
+        yield AgentResponse(text=request.query, final=True)
+
+    def get_state(self) -> Any:
+        return self.history
+
+    def set_state(self, state: Any):
+        self.history = state
+
+
+@dataclass
+class Conversation:
+    session: Session
+
+
+def conversation(manager: SessionManager, id: str, idle_time: float = 0.0) -> Conversation:
+    session = manager.create_session(id)
+    session.last_activity = time.monotonic() - idle_time
+    return Conversation(session=session)
+
+
+@pytest.mark.asyncio
+async def test_evict_expired_sessions(manager: SessionManager):
+    cache: SessionCache[Conversation] = SessionCache(idle_ttl=60)
+    cache["s1"] = conversation(manager, "s1")
+    cache["s2"] = conversation(manager, "s2")
+
+    session = cache["s1"].session
+    await session.update(Message(sender="system", receiver=None, text="m1"))
+    await asyncio.sleep(0.01)
+    session.last_activity -= 120
+
+    assert await cache.sweep() == 1
+    assert "s1" not in cache
+    assert "s2" in cache
+
+    # evicted session is saved and its workers are stopped
+    assert session._selector_task.done()
+    assert await manager.session_saved("s1")
+
+    restored = await manager.load_session("s1")
+    assert restored is not None
+    assert [m.text for m in restored.messages] == ["m1"]
+
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_evict_least_recently_used_sessions(manager: SessionManager):
+    cache: SessionCache[Conversation] = SessionCache(max_size=2, idle_ttl=None)
+    cache["s1"] = conversation(manager, "s1")
+    cache["s2"] = conversation(manager, "s2")
+
+    assert cache.get("s1") is not None  # mark s1 as recently used
+    cache["s3"] = conversation(manager, "s3")
+
+    assert await cache.sweep() == 1
+    assert "s1" in cache
+    assert "s2" not in cache
+    assert "s3" in cache
+
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_busy_sessions_are_not_evicted(manager: SessionManager):
+    cache: SessionCache[Conversation] = SessionCache(idle_ttl=60)
+    cache["s1"] = conversation(manager, "s1", idle_time=120)
+
+    session = cache["s1"].session
+    released = asyncio.Event()
+    await session._gateway_queue.put(released.wait())
+    await asyncio.sleep(0)
+
+    assert not session.idle
+    assert await cache.sweep() == 0
+    assert "s1" in cache
+
+    released.set()
+    await asyncio.sleep(0)
+
+    assert session.idle
+    assert await cache.sweep() == 1
+
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_sweep_on_exceeding_max_size(manager: SessionManager):
+    cache: SessionCache[Conversation] = SessionCache(max_size=1, idle_ttl=None)
+    cache["s1"] = conversation(manager, "s1")
+    cache["s2"] = conversation(manager, "s2")
+
+    async with asyncio.timeout(1):
+        while len(cache) > 1:
+            await asyncio.sleep(0.01)
+
+    assert "s2" in cache
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_agent_state_restored_after_hibernation(manager: SessionManager):
+    session = manager.create_session("s1")
+    echo, other = EchoAgent("echo"), EchoAgent("other")
+    session.add_agent(echo)
+    session.add_agent(other)
+    echo.history.extend(["q1", "q2"])
+    other.history.extend(["q3"])
+    await session.close()
+
+    restored = await manager.load_session("s1")
+    assert restored is not None
+
+    # agent state is restored when the agent is added again
+    restored_echo = EchoAgent("echo")
+    restored.add_agent(restored_echo)
+    assert restored_echo.history == ["q1", "q2"]
+
+    # ... and persisted states of agents not loaded are kept in snapshots
+    await restored.save(snapshot=True)
+
+    state = await manager.load_session_state("s1")
+    assert state["agents"]["echo"]["history"] == ["q1", "q2"]
+    assert state["agents"]["other"]["history"] == ["q3"]
@@ -0,0 +1,12 @@
+import pytest
+
+from hygroup.session import SessionManager
+
+
+@pytest.mark.asyncio
+async def test_sessions_share_selector_engine(manager: SessionManager):
+    session1 = manager.create_session()
+    session2 = manager.create_session()
+
+    assert session1._selector.engine is session2._selector.engine
+    assert session1._selector is not session2._selector
@@ -0,0 +1,45 @@
+import pytest
+
+from hygroup.agent import Message
+from hygroup.session import Session, SessionManager
+
+
+class UnscannableList(list):
+    """List that fails if it is scanned, to check for constant-time lookups."""
+
+    def __iter__(self):
+        raise AssertionError("messages must not be scanned")
+
+
+async def populate(session: Session, num_messages: int):
+    for i in range(num_messages):
+        sender = ["user1", "system", "agent1"][i % 3]
+        await session.update(Message(sender=sender, receiver=None, text=f"m{i}", id=f"id-{i}"), reference=False)
+
+
+@pytest.mark.parametrize("num_messages", [10, 1000])
+@pytest.mark.asyncio
+async def test_lookups_do_not_scan_messages(manager: SessionManager, num_messages: int):
+    session = manager.create_session("s1")
+    await populate(session, num_messages)
+    session._messages = UnscannableList(session._messages)
+
+    assert session.contains(f"id-{num_messages - 1}")
+    assert not session.contains("id-unknown")
+    # system messages (agent1 is not registered)
+    assert await session._num_agent_responses() == len(range(1, num_messages, 3))
+
+
+@pytest.mark.asyncio
+async def test_index_and_counters_restored_on_load(manager: SessionManager):
+    session = manager.create_session("s1")
+    await populate(session, 9)
+    await session.save(snapshot=True)
+
+    loaded = await manager.load_session("s1")
+    assert loaded is not None
+
+    assert loaded.contains("id-8")
+    assert not loaded.contains("id-9")
+    assert loaded._sender_counts == {"user1": 3, "system": 3, "agent1": 3}
+    assert await loaded._num_agent_responses() == 3
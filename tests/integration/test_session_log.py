@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any, AsyncIterator, Sequence
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+
+from hygroup.agent import Agent, AgentRequest, AgentResponse, Message
+from hygroup.gateway import Gateway
+from hygroup.session import Session, SessionManager
+
+
+class RecordingAgent(Agent):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.updates: list[list[str]] = []
+
+    async def run(
+        self, request: AgentRequest, updates: Sequence[Message] = (), stream: bool = False
+    ) -> AsyncIterator[AgentResponse]:
+        self.updates.append([update.text for update in updates])
+        yield AgentResponse(text=f"re: {request.query}", final=True)
+
+    def get_state(self) -> Any:
+        return self.updates
+
+    def set_state(self, state: Any):
+        self.updates = state
+
+
+async def message(session: Session, text: str, sender: str = "user1", receiver: str | None = None):
+    await session.update(Message(sender=sender, receiver=receiver, text=text), reference=False)
+
+
+async def invoke(session: Session, receiver: str, query: str):
+    await session.invoke(AgentRequest(query=query, sender="user1"), receiver=receiver)
+    async with asyncio.timeout(1):
+        while not session._agents[receiver].idle:
+            await asyncio.sleep(0.01)
+
+
+@pytest_asyncio.fixture
+async def session(manager: SessionManager) -> Session:
+    session = manager.create_session("s1")
+    session.set_gateway(AsyncMock(spec=Gateway))
+    return session
+
+
+@pytest.mark.asyncio
+async def test_agents_read_pending_updates_from_log(session: Session):
+    await message(session, "m1")
+    session.add_agent(RecordingAgent("a1"))
+    session.add_agent(RecordingAgent("a2"))
+    await message(session, "m2")
+    await message(session, "m3", sender="a2")
+
+    await invoke(session, "a1", "q1")
+    await message(session, "m4")
+    await invoke(session, "a1", "q2")
+
+    a1: RecordingAgent = session._agents["a1"].agent  # type: ignore
+    assert a1.updates == [["m1", "m2", "m3"], ["m4"]]
+
+    # a2 has pending updates but didn't receive them yet
+    pending = [m.text for m in session._agents["a2"].pending_updates()]
+    assert pending == ["m1", "m2", "q1", "re: q1", "m4", "q2", "re: q2"]
+
+
+@pytest.mark.asyncio
+async def test_messages_of_agent_are_not_pending(session: Session):
+    session.add_agent(RecordingAgent("a1"))
+    await message(session, "m1", receiver="a1")
+    await message(session, "m2", sender="a1")
+    await message(session, "m3")
+
+    assert [m.text for m in session._agents["a1"].pending_updates()] == ["m3"]
+
+
+@pytest.mark.asyncio
+async def test_agents_share_the_session_log(session: Session):
+    for name in ["a1", "a2", "a3"]:
+        session.add_agent(RecordingAgent(name))
+    for i in range(10):
+        await message(session, f"m{i}")
+
+    # no per-agent message copies
+    for agent in session._agents.values():
+        assert not any(isinstance(value, list) for value in vars(agent).values())
+        assert len(agent.pending_updates()) == 10
+
+
+@pytest.mark.asyncio
+async def test_cursor_is_persisted(manager: SessionManager, session: Session):
+    session.add_agent(RecordingAgent("a1"))
+    await message(session, "m1")
+    await invoke(session, "a1", "q1")
+    await message(session, "m2")
+    await session.save()
+
+    loaded = await manager.load_session("s1")
+    assert loaded is not None
+    loaded.add_agent(RecordingAgent("a1"))
+
+    assert [m.text for m in loaded._agents["a1"].pending_updates()] == ["m2"]
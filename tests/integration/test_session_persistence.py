@@ -0,0 +1,167 @@
+import json
+
+import pytest
+
+from hygroup.agent import Message
+from hygroup.session import SessionManager
+from hygroup.store import JsonSessionStore, SqliteSessionStore, apply_state_delta
+
+
+def message(text: str) -> Message:
+    return Message(sender="system", receiver="user1", text=text)
+
+
+def json_store(manager: SessionManager) -> JsonSessionStore:
+    assert isinstance(manager.store, JsonSessionStore)
+    return manager.store
+
+
+def read_journal(manager: SessionManager, session_id: str) -> list[dict]:
+    journal_path = json_store(manager).journal_path(session_id)
+    if not journal_path.exists():
+        return []
+    return [json.loads(line) for line in journal_path.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_session_is_not_saved(manager: SessionManager):
+    session = manager.create_session("s1")
+    await session.save(snapshot=True)
+    mtime = json_store(manager).session_path("s1").stat().st_mtime_ns
+
+    await session.save()
+    await session.save()
+
+    assert not json_store(manager).journal_path("s1").exists()
+    assert json_store(manager).session_path("s1").stat().st_mtime_ns == mtime
+
+
+@pytest.mark.asyncio
+async def test_journal_contains_only_new_messages(manager: SessionManager):
+    session = manager.create_session("s1")
+    await session.save(snapshot=True)
+
+    await session.update(message("m1"))
+    await session.update(message("m2"))
+    await session.save()
+
+    await session.update(message("m3"))
+    await session.save()
+
+    entries = read_journal(manager, "s1")
+    assert len(entries) == 2
+    assert entries[0]["messages"]["offset"] == 0
+    assert [m["text"] for m in entries[0]["messages"]["items"]] == ["m1", "m2"]
+    assert entries[1]["messages"]["offset"] == 2
+    assert [m["text"] for m in entries[1]["messages"]["items"]] == ["m3"]
+
+
+@pytest.mark.asyncio
+async def test_load_session_replays_journal(manager: SessionManager):
+    session = manager.create_session("s1")
+    await session.save(snapshot=True)
+
+    for text in ["m1", "m2", "m3"]:
+        await session.update(message(text))
+        await session.save()
+
+    loaded = await manager.load_session("s1")
+    assert loaded is not None
+    assert [m.text for m in loaded.messages] == ["m1", "m2", "m3"]
+
+    thread = await manager.load_thread("s1")
+    assert [m.text for m in thread.messages] == ["m1", "m2", "m3"]
+
+
+@pytest.mark.asyncio
+async def test_session_saved_with_journal_only(manager: SessionManager):
+    session = manager.create_session("s1")
+    assert not await manager.session_saved("s1")
+
+    await session.update(message("m1"))
+    await session.save()
+
+    assert not json_store(manager).session_path("s1").exists()
+    assert await manager.session_saved("s1")
+
+    loaded = await manager.load_session("s1")
+    assert loaded is not None
+    assert [m.text for m in loaded.messages] == ["m1"]
+
+
+@pytest.mark.asyncio
+async def test_journal_is_compacted(manager: SessionManager):
+    session = manager.create_session("s1")
+    await session.save(snapshot=True)
+
+    for i in range(manager.compaction_threshold):
+        await session.update(message(f"m{i}"))
+        await session.save()
+
+    assert len(read_journal(manager, "s1")) == manager.compaction_threshold
+
+    await session.update(message("last"))
+    await session.save()
+
+    assert not json_store(manager).journal_path("s1").exists()
+
+    messages = json.loads(json_store(manager).messages_path("s1").read_text())
+    assert [m["text"] for m in messages] == ["m0", "m1", "m2", "last"]
+
+
+@pytest.mark.asyncio
+async def test_incomplete_journal_entry_is_skipped(manager: SessionManager):
+    session = manager.create_session("s1")
+    await session.save(snapshot=True)
+
+    await session.update(message("m1"))
+    await session.save()
+
+    with open(json_store(manager).journal_path("s1"), "a") as f:
+        f.write('{"messages": {"offset": 1, "ite')
+
+    state = await manager.load_session_state("s1")
+    assert [m["text"] for m in state["messages"]] == ["m1"]
+
+
+def test_journal_replay_is_idempotent():
+    state: dict = {"messages": [{"text": "m1"}], "agents": {}, "selector": []}
+    entry = {
+        "messages": {"offset": 1, "items": [{"text": "m2"}]},
+        "agents": {"agent1": {"updates": [], "history": {"offset": 0, "items": [{"h": 1}]}}},
+    }
+
+    apply_state_delta(state, entry)
+    apply_state_delta(state, entry)
+
+    assert state["messages"] == [{"text": "m1"}, {"text": "m2"}]
+    assert state["agents"]["agent1"]["history"] == [{"h": 1}]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_is_not_compacted(manager: SessionManager, tmp_path):
+    manager.store = SqliteSessionStore(tmp_path / "sessions.db")
+    session = manager.create_session("s1")
+    await session.save(snapshot=True)
+
+    for i in range(manager.compaction_threshold + 1):
+        await session.update(message(f"m{i}"))
+        await session.save()
+
+    assert session._journal_size == manager.compaction_threshold + 1
+
+    loaded = await manager.load_session("s1")
+    assert loaded is not None
+    assert [m.text for m in loaded.messages] == [f"m{i}" for i in range(manager.compaction_threshold + 1)]
+
+    await session.close()
+    await loaded.close()
+    manager.store.close()
+
+
+@pytest.mark.asyncio
+async def test_load_missing_thread(manager: SessionManager):
+    with pytest.raises(FileNotFoundError):
+        await manager.load_thread("s1")
+
+    assert await manager.load_threads(["s1"]) == []
@@ -0,0 +1,169 @@
+import json
+import sqlite3
+from typing import Iterator
+
+import pytest
+
+from hygroup.store import JsonSessionStore, SessionStore, SqliteSessionStore
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path) -> Iterator[SessionStore]:
+    match request.param:
+        case "json":
+            yield JsonSessionStore(tmp_path / "sessions")
+        case "sqlite":
+            sqlite_store = SqliteSessionStore(tmp_path / "sessions.db")
+            yield sqlite_store
+            sqlite_store.close()
+
+
+def message(text: str, id: str | None = None) -> dict:
+    return {"sender": "user1", "receiver": None, "text": text, "threads": [], "handoffs": None, "id": id}
+
+
+def state(*texts: str) -> dict:
+    return {
+        "messages": [message(text, id=f"id-{text}") for text in texts],
+        "agents": {"agent1": {"updates": [message("u1")], "history": [{"h": 1}, {"h": 2}]}},
+        "selector": [{"s": 1}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_save_and_load_state(store: SessionStore):
+    assert not await store.exists("s1")
+
+    await store.save_state("s1", state("m1", "m2"))
+
+    assert await store.exists("s1")
+    assert await store.load_state("s1") == state("m1", "m2")
+
+
+@pytest.mark.asyncio
+async def test_save_state_replaces_state(store: SessionStore):
+    await store.save_state("s1", state("m1", "m2"))
+    await store.save_state("s1", state("m3"))
+
+    assert await store.load_state("s1") == state("m3")
+
+
+@pytest.mark.asyncio
+async def test_append_state(store: SessionStore):
+    await store.save_state("s1", state("m1"))
+    await store.append_state(
+        "s1",
+        {
+            "messages": {"offset": 1, "items": [message("m2")]},
+            "selector": {"offset": 1, "items": [{"s": 2}]},
+            "agents": {
+                "agent1": {"updates": [], "history": {"offset": 2, "items": [{"h": 3}]}},
+                "agent2": {"updates": [message("u2")], "history": {"offset": 0, "items": [{"h": 1}]}},
+            },
+        },
+    )
+
+    loaded = await store.load_state("s1")
+    assert [m["text"] for m in loaded["messages"]] == ["m1", "m2"]
+    assert loaded["selector"] == [{"s": 1}, {"s": 2}]
+    assert loaded["agents"]["agent1"] == {"updates": [], "history": [{"h": 1}, {"h": 2}, {"h": 3}]}
+    assert loaded["agents"]["agent2"] == {"updates": [message("u2")], "history": [{"h": 1}]}
+
+
+@pytest.mark.asyncio
+async def test_append_state_truncates_to_offset(store: SessionStore):
+    await store.save_state("s1", state("m1", "m2", "m3"))
+    await store.append_state("s1", {"messages": {"offset": 1, "items": [message("m4")]}})
+
+    loaded = await store.load_state("s1")
+    assert [m["text"] for m in loaded["messages"]] == ["m1", "m4"]
+
+
+@pytest.mark.asyncio
+async def test_append_state_without_snapshot(store: SessionStore):
+    await store.append_state("s1", {"messages": {"offset": 0, "items": [message("m1")]}})
+
+    assert await store.exists("s1")
+    loaded = await store.load_state("s1")
+    assert [m["text"] for m in loaded["messages"]] == ["m1"]
+
+
+@pytest.mark.asyncio
+async def test_load_missing_state(store: SessionStore):
+    with pytest.raises(FileNotFoundError):
+        await store.load_state("s1")
+
+
+@pytest.mark.asyncio
+async def test_load_messages(store: SessionStore):
+    await store.save_state("s1", state("m1"))
+    await store.append_state("s1", {"messages": {"offset": 1, "items": [message("m2")]}})
+
+    assert [m["text"] for m in await store.load_messages("s1")] == ["m1", "m2"]
+
+    with pytest.raises(FileNotFoundError):
+        await store.load_messages("s2")
+
+
+@pytest.mark.asyncio
+async def test_list_and_delete_sessions(store: SessionStore):
+    await store.save_state("s1", state("m1"))
+    await store.append_state("s2", {"messages": {"offset": 0, "items": [message("m1")]}})
+
+    assert sorted(await store.list_sessions()) == ["s1", "s2"]
+
+    await store.delete("s1")
+
+    assert not await store.exists("s1")
+    assert await store.list_sessions() == ["s2"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_uses_wal_mode(tmp_path):
+    store = SqliteSessionStore(tmp_path / "sessions.db")
+    await store.save_state("s1", state("m1"))
+    store.close()
+
+    conn = sqlite3.connect(str(tmp_path / "sessions.db"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_looks_up_messages_by_id(tmp_path):
+    store = SqliteSessionStore(tmp_path / "sessions.db")
+    await store.save_state("s1", state("m1"))
+    await store.append_state("s1", {"messages": {"offset": 1, "items": [message("m2", id="id-m2")]}})
+
+    assert await store.contains_message("s1", "id-m1")
+    assert await store.contains_message("s1", "id-m2")
+    assert not await store.contains_message("s1", "id-m3")
+    assert not await store.contains_message("s2", "id-m1")
+
+    query_plan = store._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT 1 FROM messages WHERE session_id = ? AND message_id = ?", ("s1", "id-m1")
+    ).fetchall()
+    assert any("messages_message_id" in row[-1] for row in query_plan)
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_json_store_loads_messages_without_agent_state(tmp_path):
+    store = JsonSessionStore(tmp_path / "sessions")
+    await store.save_state("s1", state("m1"))
+    await store.append_state("s1", {"messages": {"offset": 1, "items": [message("m2")]}})
+
+    # agent and selector state is not read
+    store.session_path("s1").write_text("not json")
+
+    assert [m["text"] for m in await store.load_messages("s1")] == ["m1", "m2"]
+
+
+@pytest.mark.asyncio
+async def test_json_store_loads_unsplit_snapshot(tmp_path):
+    store = JsonSessionStore(tmp_path / "sessions")
+    store.session_path("s1").write_text(json.dumps(state("m1")))
+
+    assert await store.load_state("s1") == state("m1")
+    assert [m["text"] for m in await store.load_messages("s1")] == ["m1"]
+    assert await store.list_sessions() == ["s1"]
@@ -0,0 +1,139 @@
+import asyncio
+from typing import Any, AsyncIterator, Sequence
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+
+from hygroup.agent import Agent, AgentRequest, AgentResponse, Message
+from hygroup.gateway import Gateway
+from hygroup.gateway.slack import SlackGateway
+from hygroup.gateway.slack.gateway import SlackThread
+from hygroup.session import SessionManager
+
+
+class StreamingAgent(Agent):
+    def __init__(self, name: str, deltas: list[str]):
+        super().__init__(name)
+        self.deltas = deltas
+        self.stream: bool | None = None
+
+    async def run(
+        self, request: AgentRequest, updates: Sequence[Message] = (), stream: bool = False
+    ) -> AsyncIterator[AgentResponse]:
+        self.stream = stream
+        if stream:
+            for delta in self.deltas:
+                yield AgentResponse(text=delta, final=False)
+        yield AgentResponse(text="".join(self.deltas), final=True)
+
+    def get_state(self) -> Any:
+        return []
+
+    def set_state(self, state: Any):
+        pass
+
+
+class StreamingGateway(Gateway):
+    def __init__(self, streaming: bool):
+        self._streaming = streaming
+        self.responses: list[AgentResponse] = []
+
+    @property
+    def streaming(self) -> bool:
+        return self._streaming
+
+    async def start(self, join: bool = True):
+        pass
+
+    async def handle_agent_response(self, response: AgentResponse, sender: str, receiver: str, session_id: str):
+        self.responses.append(response)
+
+
+async def run_agent(manager: SessionManager, gateway: Gateway) -> StreamingAgent:
+    session = manager.create_session("s1")
+    session.set_gateway(gateway)
+
+    agent = StreamingAgent("a1", ["Hel", "lo"])
+    session.add_agent(agent)
+    await session.invoke(AgentRequest(query="hi", sender="user1"), receiver="a1")
+
+    async with asyncio.timeout(1):
+        while not session.idle:
+            await asyncio.sleep(0.01)
+
+    # only the final response is added to the session history
+    assert [(m.sender, m.text) for m in session.messages] == [("user1", "hi"), ("a1", "Hello")]
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_partial_responses_are_streamed_to_gateway(manager: SessionManager):
+    gateway = StreamingGateway(streaming=True)
+    agent = await run_agent(manager, gateway)
+
+    assert agent.stream
+    assert [(r.text, r.final) for r in gateway.responses] == [("Hel", False), ("lo", False), ("Hello", True)]
+
+
+@pytest.mark.asyncio
+async def test_responses_are_not_streamed_to_non_streaming_gateway(manager: SessionManager):
+    gateway = StreamingGateway(streaming=False)
+    agent = await run_agent(manager, gateway)
+
+    assert agent.stream is False
+    assert [(r.text, r.final) for r in gateway.responses] == [("Hello", True)]
+
+
+@pytest_asyncio.fixture
+async def slack_gateway(monkeypatch):
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-test")
+    monkeypatch.setenv("SLACK_APP_TOKEN", "xapp-test")
+
+    gateway = SlackGateway(session_manager=MagicMock(), stream_responses=True)
+    gateway._client = AsyncMock()
+    gateway._client.chat_postMessage.return_value = {"ts": "1.1"}
+
+    session = MagicMock()
+    session.agent_registry.get_emoji = AsyncMock(return_value=None)
+    gateway._threads._entries["t1"] = SlackThread(channel="c1", session=session)
+    yield gateway
+
+    await gateway._handler.close_async()
+
+
+async def stream(gateway: SlackGateway, *deltas: str):
+    for delta in deltas:
+        await gateway.handle_agent_response(AgentResponse(text=delta, final=False), "a1", "user1", "t1")
+    await gateway.handle_agent_response(AgentResponse(text="".join(deltas), final=True), "a1", "user1", "t1")
+
+
+def mock_client(gateway: SlackGateway) -> AsyncMock:
+    assert isinstance(gateway._client, AsyncMock)
+    return gateway._client
+
+
+def sent_texts(mock: AsyncMock) -> list[str]:
+    return [call.kwargs["text"] for call in mock.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_slack_response_is_edited_in_place(slack_gateway: SlackGateway):
+    slack_gateway._stream_update_interval = 0.0
+    await stream(slack_gateway, "a", "b", "c")
+
+    client = mock_client(slack_gateway)
+    assert sent_texts(client.chat_postMessage) == ["<@user1> a"]
+    assert sent_texts(client.chat_update) == ["<@user1> ab", "<@user1> abc", "<@user1> abc"]
+    assert all(call.kwargs["ts"] == "1.1" for call in client.chat_update.call_args_list)
+    assert slack_gateway._threads["t1"].streams == {}
+
+
+@pytest.mark.asyncio
+async def test_slack_updates_are_coalesced(slack_gateway: SlackGateway):
+    slack_gateway._stream_update_interval = 60.0
+    await stream(slack_gateway, "a", "b", "c")
+
+    client = mock_client(slack_gateway)
+    assert sent_texts(client.chat_postMessage) == ["<@user1> a"]
+    assert sent_texts(client.chat_update) == ["<@user1> abc"]
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from hygroup.agent import Message
+from hygroup.session import SessionManager
+from hygroup.store import JsonSessionStore
+
+
+class CountingStore(JsonSessionStore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loads: list[str] = []
+        self.delay = 0.0
+
+    async def load_messages(self, id: str) -> list[dict[str, Any]]:
+        self.loads.append(id)
+        await asyncio.sleep(self.delay)
+        return await super().load_messages(id)
+
+
+@pytest.fixture
+def store(manager: SessionManager, tmp_path) -> CountingStore:
+    manager.store = CountingStore(tmp_path / "counting")
+    return manager.store
+
+
+async def save_thread(manager: SessionManager, id: str, *texts: str):
+    session = manager.create_session(id)
+    for text in texts:
+        await session.update(Message(sender="user1", receiver=None, text=text))
+    await session.save(snapshot=True)
+
+
+@pytest.mark.asyncio
+async def test_threads_are_cached(manager: SessionManager, store: CountingStore):
+    await save_thread(manager, "s1", "m1", "m2")
+
+    thread1 = await manager.load_thread("s1")
+    thread2 = await manager.load_thread("s1")
+
+    assert thread1 is thread2
+    assert [m.text for m in thread1.messages] == ["m1", "m2"]
+    assert store.loads == ["s1"]
+
+
+@pytest.mark.asyncio
+async def test_thread_cache_invalidated_on_save(manager: SessionManager, store: CountingStore):
+    await save_thread(manager, "s1", "m1")
+    await manager.load_thread("s1")
+
+    session = manager.create_session("s1")
+    await session.load()
+    await session.update(Message(sender="user1", receiver=None, text="m2"))
+    await session.save()
+
+    thread = await manager.load_thread("s1")
+    assert [m.text for m in thread.messages] == ["m1", "m2"]
+    assert store.loads == ["s1", "s1"]
+
+
+@pytest.mark.asyncio
+async def test_thread_cache_evicts_least_recently_used(manager: SessionManager, store: CountingStore):
+    manager.thread_cache_size = 2
+    for id in ["s1", "s2", "s3"]:
+        await save_thread(manager, id, "m1")
+
+    await manager.load_threads(["s1", "s2"])
+    await manager.load_thread("s1")
+    await manager.load_thread("s3")
+    store.loads.clear()
+
+    await manager.load_threads(["s1", "s2", "s3"])
+    assert store.loads == ["s2"]
+
+
+@pytest.mark.asyncio
+async def test_threads_are_loaded_concurrently(manager: SessionManager, store: CountingStore):
+    for id in ["s1", "s2", "s3"]:
+        await save_thread(manager, id, f"{id}-m1")
+
+    store.delay = 0.2
+
+    async with asyncio.timeout(0.5):
+        threads = await manager.load_threads(["s3", "missing", "s1", "s2", "s1"])
+
+    assert [thread.session_id for thread in threads] == ["s3", "s1", "s2", "s1"]
+    assert sorted(store.loads) == ["s1", "s2", "s3"]
+
+
+@pytest.mark.asyncio
+async def test_thread_loaded_during_save_is_not_cached(manager: SessionManager, store: CountingStore):
+    await save_thread(manager, "s1", "m1")
+    store.delay = 0.1
+
+    load = asyncio.create_task(manager.load_thread("s1"))
+    await asyncio.sleep(0.01)
+    await manager.append_session_journal("s1", {"messages": {"offset": 1, "items": []}})
+    await load
+
+    store.delay = 0.0
+    await manager.load_thread("s1")
+    assert store.loads == ["s1", "s1"]
@@ -0,0 +1,90 @@
+import pytest
+
+from hygroup.agent import Message, Thread
+from hygroup.agent.default.prompt import format_message
+from hygroup.session import SessionManager, message_from_dict, message_to_dict
+
+
+async def save_thread(manager: SessionManager, id: str, *texts: str):
+    session = manager.create_session(id)
+    for text in texts:
+        await session.update(Message(sender="user1", receiver=None, text=text), reference=False)
+    await session.save(snapshot=True)
+
+
+def test_message_round_trip():
+    thread = Thread(session_id="s0", messages=[Message(sender="user1", receiver=None, text="t1")])
+    message = Message(sender="user1", receiver="agent1", text="see thread:s0", threads=[thread], id="m1")
+
+    data = message_to_dict(message)
+    assert data["threads"] == [{"session_id": "s0", "version": 1}]
+
+    restored = message_from_dict(data, {"s0": thread})
+    assert restored == message
+    assert restored.threads[0] is thread
+
+
+def test_message_from_dict_with_embedded_thread():
+    data = {
+        "sender": "user1",
+        "receiver": None,
+        "text": "see thread:s0",
+        "threads": [
+            {
+                "session_id": "s0",
+                "messages": [
+                    {"sender": "user2", "receiver": None, "text": "t1", "threads": [], "handoffs": None, "id": None}
+                ],
+            }
+        ],
+        "handoffs": None,
+        "id": None,
+    }
+
+    message = message_from_dict(data, {})
+    assert message.threads == [Thread(session_id="s0", messages=[Message(sender="user2", receiver=None, text="t1")])]
+
+
+@pytest.mark.asyncio
+async def test_threads_are_stored_by_reference(manager: SessionManager):
+    await save_thread(manager, "s0", "t1", "t2")
+
+    session = manager.create_session("s1")
+    await session.update(Message(sender="user1", receiver=None, text="see thread:s0"))
+    await session.save(snapshot=True)
+
+    state = await manager.store.load_state("s1")
+    assert state["messages"][0]["threads"] == [{"session_id": "s0", "version": 2}]
+
+
+@pytest.mark.asyncio
+async def test_referenced_threads_are_shared(manager: SessionManager):
+    await save_thread(manager, "s0", "t1")
+
+    session1 = manager.create_session("s1")
+    session2 = manager.create_session("s2")
+    await session1.update(Message(sender="user1", receiver=None, text="see thread:s0"))
+    await session2.update(Message(sender="user1", receiver=None, text="see thread:s0"))
+
+    assert session1.messages[0].threads[0] is session2.messages[0].threads[0]
+
+
+@pytest.mark.asyncio
+async def test_loaded_references_resolve_referenced_version(manager: SessionManager):
+    await save_thread(manager, "s0", "t1", "t2")
+
+    session = manager.create_session("s1")
+    await session.update(Message(sender="user1", receiver=None, text="see thread:s0"))
+    await session.save(snapshot=True)
+    formatted = format_message(session.messages[0])
+
+    # referenced thread continues after the reference
+    thread = await manager.load_session("s0")
+    assert thread is not None
+    await thread.update(Message(sender="user1", receiver=None, text="t3"), reference=False)
+    await thread.save()
+
+    loaded = await manager.load_session("s1")
+    assert loaded is not None
+    assert [m.text for m in loaded.messages[0].threads[0].messages] == ["t1", "t2"]
+    assert format_message(loaded.messages[0]) == formatted
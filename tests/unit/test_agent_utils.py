@@ -1,6 +1,9 @@
+import httpx
 import pytest
+from pydantic_ai.models.openai import OpenAIModel
 
 from hygroup.agent.default.utils import resolve_config_variables
+from hygroup.agent.utils import ProviderRegistry, model_from_dict
 
 
 @pytest.mark.parametrize(
@@ -169,3 +172,56 @@ def test_resolve_config_variables_with_non_string_values():
     result, updated = resolve_config_variables(original, config)
     assert result == {"int": 42, "bool": True, "none": None}
     assert updated is False
+
+
+OPENAI_PROVIDER = "pydantic_ai.providers.openai.OpenAIProvider"
+
+
+def openai_model(api_key: str) -> dict:
+    return {
+        "class": "pydantic_ai.models.openai.OpenAIModel",
+        "args": {"model_name": "gpt-4o", "provider": {"class": OPENAI_PROVIDER, "args": {"api_key": api_key}}},
+    }
+
+
+def test_models_share_provider():
+    registry = ProviderRegistry()
+    model1 = model_from_dict(openai_model("key-1"), registry)
+    model2 = model_from_dict(openai_model("key-1"), registry)
+
+    assert isinstance(model1, OpenAIModel)
+    assert isinstance(model2, OpenAIModel)
+    assert model1 is not model2
+    assert model1.client is model2.client
+    assert len(registry) == 1
+
+
+def test_providers_share_http_client():
+    registry = ProviderRegistry(limits=httpx.Limits(max_connections=5))
+    provider1 = registry.provider(OPENAI_PROVIDER, {"api_key": "key-1"})
+    provider2 = registry.provider(OPENAI_PROVIDER, {"api_key": "key-2"})
+
+    assert provider1 is not provider2
+    assert provider1.client._client is registry.http_client()
+    assert provider2.client._client is registry.http_client()
+    # provider args are not retained
+    assert "key-1" not in str(registry.__dict__)
+
+
+def test_provider_with_own_client_is_not_shared():
+    registry = ProviderRegistry()
+    http_client = httpx.AsyncClient()
+    provider = registry.provider(OPENAI_PROVIDER, {"api_key": "key-1", "http_client": http_client})
+
+    assert provider.client._client is http_client
+
+
+@pytest.mark.asyncio
+async def test_providers_are_recreated_after_close():
+    registry = ProviderRegistry()
+    provider1 = registry.provider(OPENAI_PROVIDER, {"api_key": "key-1"})
+    await registry.close()
+    provider2 = registry.provider(OPENAI_PROVIDER, {"api_key": "key-1"})
+
+    assert provider1 is not provider2
+    assert not provider2.client._client.is_closed
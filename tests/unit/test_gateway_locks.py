@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from hygroup.gateway.locks import LockManager
+
+PROCESSING_TIME = 0.01
+MESSAGES_PER_THREAD = 5
+
+
+async def handle_messages(locks: LockManager, thread_ids: list[str]):
+    """Simulate handling `MESSAGES_PER_THREAD` messages in each thread concurrently."""
+
+    async def handle(thread_id: str):
+        async with locks.acquire(thread_id):
+            await asyncio.sleep(PROCESSING_TIME)
+
+    await asyncio.gather(*[handle(thread_id) for thread_id in thread_ids for _ in range(MESSAGES_PER_THREAD)])
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_serialized():
+    locks = LockManager()
+    active = 0
+    max_active = 0
+
+    async def handle():
+        nonlocal active, max_active
+        async with locks.acquire("thread-1"):
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.001)
+            active -= 1
+
+    await asyncio.gather(*[handle() for _ in range(10)])
+    assert max_active == 1
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_concurrently():
+    locks = LockManager()
+    entered = asyncio.Event()
+
+    async def slow():
+        async with locks.acquire("thread-1"):
+            entered.set()
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(slow())
+    await entered.wait()
+
+    # must not be blocked by the slow holder of another thread's lock
+    async with asyncio.timeout(1):
+        async with locks.acquire("thread-2"):
+            pass
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_locks_are_released():
+    locks = LockManager()
+
+    async with locks.acquire("thread-1"):
+        assert locks.locked("thread-1")
+        assert len(locks) == 1
+
+    assert not locks.locked("thread-1")
+    assert len(locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_lock_released_on_cancelled_wait():
+    locks = LockManager()
+
+    async with locks.acquire("thread-1"):
+        waiter = asyncio.create_task(locks.acquire("thread-1").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    assert len(locks) == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_time_metrics():
+    locks = LockManager()
+    await handle_messages(locks, ["thread-1"])
+
+    stats = locks.stats
+    assert stats.acquisitions == MESSAGES_PER_THREAD
+    assert stats.contended == MESSAGES_PER_THREAD - 1
+    assert stats.max_wait_time >= PROCESSING_TIME * (MESSAGES_PER_THREAD - 1) * 0.9
+    assert 0 < stats.mean_wait_time <= stats.max_wait_time
+
+
+@pytest.mark.parametrize("num_threads", [1, 4, 16])
+@pytest.mark.asyncio
+async def test_threads_are_processed_concurrently(num_threads: int):
+    locks = LockManager()
+    active = 0
+    max_active = 0
+
+    async def handle(thread_id: str):
+        nonlocal active, max_active
+        async with locks.acquire(thread_id):
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(PROCESSING_TIME)
+            active -= 1
+
+    thread_ids = [f"thread-{i}" for i in range(num_threads)]
+    await asyncio.gather(*[handle(thread_id) for thread_id in thread_ids for _ in range(MESSAGES_PER_THREAD)])
+
+    # with a single process-wide lock, at most one message would be handled at a time
+    assert max_active == num_threads
+    assert locks.stats.contended == num_threads * (MESSAGES_PER_THREAD - 1)
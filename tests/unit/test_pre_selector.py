@@ -0,0 +1,50 @@
+import pytest
+
+from hygroup.agent import Message
+from hygroup.agent.select import RulePreSelector
+
+
+def message(text: str) -> Message:
+    return Message(sender="user1", receiver=None, text=text)
+
+
+@pytest.mark.parametrize(
+    "text, rule",
+    [
+        ("thanks!", "greeting"),
+        ("Thank you :pray:", "greeting"),
+        ("hi all", "greeting"),
+        ("+1", "reaction"),
+        (":tada: :tada:", "reaction"),
+        ("👍", "reaction"),
+        ("", "reaction"),
+        ("no", "length"),
+        ("What is the weather in Vienna tomorrow?", None),
+        ("hi, can you summarize this thread?", None),
+    ],
+)
+def test_rules(text: str, rule: str | None):
+    assert RulePreSelector().match(message(text)) == rule
+
+
+def test_keywords_take_precedence():
+    pre_selector = RulePreSelector(keywords=["help"])
+    assert pre_selector.match(message("help")) is None
+    assert pre_selector.match(message("hi")) == "greeting"
+
+
+def test_patterns():
+    pre_selector = RulePreSelector(patterns=[r"^/noagent\b"])
+    assert pre_selector.match(message("/noagent what is the weather in Vienna?")) == "pattern"
+    assert pre_selector.match(message("what is the weather in Vienna?")) is None
+
+
+def test_stats():
+    pre_selector = RulePreSelector()
+    for text in ["thanks", "+1", "thanks", "What is the weather in Vienna tomorrow?"]:
+        pre_selector.skip(message(text))
+
+    assert pre_selector.stats.messages == 4
+    assert pre_selector.stats.skipped == 3
+    assert pre_selector.stats.hit_rate == 0.75
+    assert pre_selector.stats.rules == {"greeting": 2, "reaction": 1}
@@ -0,0 +1,62 @@
+import pytest
+
+from hygroup.agent.select.router import NO_AGENT, Router, SelectionDecision, SelectionLog, train_router
+
+WEATHER = ["what is the weather in {}", "will it rain in {} tomorrow", "weather forecast for {}"]
+SEARCH = ["search the web for {}", "find recent news about {}", "look up {} online"]
+CHAT = ["I think {} is nice", "we met in {} last year", "lunch in {} was great"]
+PLACES = ["vienna", "berlin", "paris", "rome", "london", "madrid"]
+
+
+def decisions() -> list[SelectionDecision]:
+    result = []
+    for place in PLACES:
+        result += [SelectionDecision(t.format(place), "weather", confirmed=True) for t in WEATHER]
+        result += [SelectionDecision(t.format(place), "search", confirmed=True) for t in SEARCH]
+        # rejected selections are no-agent examples
+        result += [SelectionDecision(t.format(place), "search", confirmed=False) for t in CHAT]
+    return result
+
+
+@pytest.mark.parametrize(
+    "decision, label",
+    [
+        (SelectionDecision("t", "weather", confirmed=True), "weather"),
+        (SelectionDecision("t", None, confirmed=True), NO_AGENT),
+        (SelectionDecision("t", "weather", confirmed=False), NO_AGENT),
+        (SelectionDecision("t", None, confirmed=False), None),
+    ],
+)
+def test_decision_label(decision: SelectionDecision, label: str | None):
+    assert decision.label() == label
+
+
+def test_router_predicts_trained_agents(tmp_path):
+    router = train_router(decisions(), dim=2**10)
+    router.save(tmp_path / "router.npz")
+    router = Router.load(tmp_path / "router.npz")
+
+    assert router.labels == [NO_AGENT, "search", "weather"]
+    assert router.predict("what is the weather in oslo")[0] == "weather"
+    assert router.predict("search the web for oslo")[0] == "search"
+    assert router.predict("lunch in oslo was great")[0] is None
+    assert router.predict("will it rain in oslo tomorrow")[1] > 0.9
+
+
+def test_train_without_usable_decisions():
+    with pytest.raises(ValueError):
+        train_router([SelectionDecision("t", None, confirmed=False)])
+
+
+@pytest.mark.asyncio
+async def test_selection_log(tmp_path):
+    log = SelectionLog(tmp_path / "agents" / "selections.jsonl")
+    assert log.read() == []
+
+    await log.append(SelectionDecision("t1", "weather", confirmed=True))
+    await log.append(SelectionDecision("t2", None, confirmed=False, comment="use search"))
+
+    assert log.read() == [
+        SelectionDecision("t1", "weather", confirmed=True),
+        SelectionDecision("t2", None, confirmed=False, comment="use search"),
+    ]